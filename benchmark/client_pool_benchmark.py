@@ -0,0 +1,108 @@
+#!/usr/bin/python
+
+import httplib2
+import json
+import os
+import sys
+import threading
+import time
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# External modules
+from googleapiclient import discovery
+from lib.clientpool import *
+from lib.constant import *
+
+CALL_COUNT          = 200
+DUMMY_SCHEMA_COUNT  = 400
+PROJECT_ID          = 'benchmark-project'
+ZONE_NAME           = 'us-east1-b'
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Keep-alive is required for pooled clients to reuse their connection
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1
+
+    def do_GET(self):
+        if self.path.startswith('/discovery/'):
+            body = self.server.discovery_document
+        else:
+            body = '{"items": []}'
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+def get_discovery_document(port):
+    # Pad schemas so the document is close to real Compute Engine discovery document in size
+    schemas = {}
+    for index in range(DUMMY_SCHEMA_COUNT):
+        schemas['Dummy%s' % index] = {
+            'id': 'Dummy%s' % index,
+            'type': 'object',
+            'properties': dict(('field%s' % field, {'type': 'string', 'description': 'x' * 64}) for field in range(20))
+        }
+
+    return json.dumps({
+        'kind': 'discovery#restDescription',
+        'name': API_TYPE,
+        'version': API_VERSION,
+        'rootUrl': 'http://127.0.0.1:%s/' % port,
+        'servicePath': 'compute/v1/projects/',
+        'batchPath': 'batch',
+        'parameters': {},
+        'schemas': schemas,
+        'resources': {
+            'instances': {
+                'methods': {
+                    'list': {
+                        'id': 'compute.instances.list',
+                        'path': '{project}/zones/{zone}/instances',
+                        'httpMethod': 'GET',
+                        'parameters': {
+                            'project': {'type': 'string', 'required': True, 'location': 'path'},
+                            'zone': {'type': 'string', 'required': True, 'location': 'path'}
+                        },
+                        'parameterOrder': ['project', 'zone']
+                    }
+                }
+            }
+        }
+    })
+
+def run(name, get_client):
+    start_time = time.time()
+    for index in range(CALL_COUNT):
+        get_client().instances().list(project=PROJECT_ID, zone=ZONE_NAME).execute()
+    elapsed_time = time.time() - start_time
+    print '%-32s %8.3f ms/call' % (name, elapsed_time * 1000 / CALL_COUNT)
+
+if __name__ == "__main__":
+    server = StandInServer(('127.0.0.1', 0), StandInHandler)
+    server.discovery_document = get_discovery_document(server.server_port)
+    threading.Thread(target=server.serve_forever).start()
+
+    try:
+        discovery_service_url = 'http://127.0.0.1:%s/discovery/v1/apis/{api}/{apiVersion}/rest' % server.server_port
+        print 'Discovery document size: %s bytes, %s call(s) each' % (len(server.discovery_document), CALL_COUNT)
+
+        # Before: build a new client from discovery document for every API call
+        run('discovery.build() per call', lambda: discovery.build(API_TYPE, API_VERSION, http=httplib2.Http(),
+            discoveryServiceUrl=discovery_service_url, cache_discovery=False))
+
+        # After: reuse per-thread client from pool
+        client_pool = ClientPool(None, discovery_service_url)
+        run('ClientPool.get_client()', client_pool.get_client)
+    finally:
+        server.shutdown()
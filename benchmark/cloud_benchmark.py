@@ -0,0 +1,103 @@
+#!/usr/bin/python
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# External modules
+from gce_manager import *
+
+INSTANCE_COUNT_LIST = [100, 1000, 10000]
+PLACEMENT_COUNT     = 1000
+TICK_COUNT          = 5
+ZONE_LIST           = ['us-east1-b', 'us-east1-c', 'us-east1-d', 'us-central1-a', 'us-central1-b', 'us-central1-c',
+                       'us-central1-f', 'us-west1-a', 'us-west1-b', 'europe-west1-b', 'europe-west1-c', 'europe-west1-d']
+
+class BenchmarkConfig:
+    INSTANCE_NAME_PREFIX_LIST = ['bench-']
+    MIN_ZONE_SPREAD_COUNT = 3
+    NON_PREEMPTIBLE_INSTANCE_MIN_ALIVE_HOUR = 3
+    PREEMPTIBLE_HIGH_DEMAND_ZONE_THRESHOLD = 0.5
+    UPTIME_REFRESH_INTERVAL = UPTIME_REFRESH_SECOND
+    ZONE_LIST = ZONE_LIST
+
+def get_instance_list(instance_count):
+    instance_list = []
+    for index in range(instance_count):
+        instance = Instance('bench-%s' % index)
+        instance.ip = '10.0.%s.%s' % (index / 256, index % 256)
+        instance.preemptible = True
+        instance.status = GCE_STATUS_RUNNING
+        instance.zone = ZONE_LIST[index % len(ZONE_LIST)]
+        instance_list.append(instance)
+    return instance_list
+
+class BenchmarkManager(GCE_Manager):
+    # Skip GCE_Manager.__init__() to avoid connecting to GCE, Slack and loading cloud cache from filesystem
+    def __init__(self, instance_count):
+        self.config = BenchmarkConfig()
+        self.snapshot = Snapshot(0, (), ())
+        self.state_version, self.state_ts = None, 0
+        self.table_cache = {}
+        self.terminated_record_list = []
+        self.termination_rate_threshold = float(1) / self.config.NON_PREEMPTIBLE_INSTANCE_MIN_ALIVE_HOUR
+        self.unstable_zone_threshold = float(len(ZONE_LIST)) * self.config.PREEMPTIBLE_HIGH_DEMAND_ZONE_THRESHOLD
+        self.cloud = Cloud(get_instance_list(instance_count))
+        self.cloud_cache = Cloud(get_instance_list(instance_count))
+
+        # Every third zone is terminating preemptible instance(s) above threshold
+        for index, zone_name in enumerate(ZONE_LIST):
+            zone = Zone(zone_name)
+            zone.pe_uptime_hour = 10
+            zone.total_termination_count = 10 if index % 3 == 0 else 1
+            self.cloud_cache.add_zone(zone)
+
+        self.zone_aggregate = ZoneAggregate(self.cloud_cache.get_zone_list(), ZONE_LIST, self.termination_rate_threshold)
+        self.update_zone_instance_count()
+
+        # Journal to a temporary directory instead of user home
+        self.util = Util(DEFAULT_LOGGER_NAME)
+        self.state_backend = Journal('gce-manager-benchmark', self.util)
+        self.state_backend.journal_file = os.path.join(tempfile.mkdtemp(), os.path.basename(self.state_backend.journal_file))
+        self.state_backend.load()
+        self.event_queue = EventQueue(EVENT_QUEUE_NAME, self.util.logger.info, EVENT_WORKER_COUNT)
+
+def placement(manager, instance):
+    # Zone lookups done by on_instance_terminated_notification() and process_terminated_instance()
+    for index in range(PLACEMENT_COUNT):
+        if not manager.low_preemptible_supply():
+            manager.get_zone_candidate(instance)
+
+def tick(manager):
+    # Steady state tick of instance_event_engine() and update_slackbot_summary_table_cache()
+    manager.update_cloud_metric()
+    manager.refresh_state()
+    manager.get_cached_table(manager.get_zone_summary_table)
+    manager.get_cached_table(manager.get_instance_summary_table)
+
+def time_per_run(target, *args):
+    start_time = time.time()
+    for index in range(TICK_COUNT):
+        target(*args)
+    return (time.time() - start_time) * 1000 / TICK_COUNT
+
+if __name__ == "__main__":
+    for instance_count in INSTANCE_COUNT_LIST:
+        manager = BenchmarkManager(instance_count)
+        tick_time = time_per_run(tick, manager)
+
+        # CloudDiff alone, independent of GCE_Manager and GAPI
+        diff_time = time_per_run(lambda: CloudDiff(manager.cloud_cache, manager.cloud).get_event_list())
+
+        # Zone selection for a single terminated instance
+        placement_time = time_per_run(placement, manager, manager.cloud.get_instance_list()[0]) * 1000 / PLACEMENT_COUNT
+
+        # Full cloud cache pickle which used to be written on every tick, against journal written during steady state ticks
+        pickle_size = len(pickle.dumps(manager.cloud_cache, pickle.HIGHEST_PROTOCOL))
+        journal_size = os.path.getsize(manager.state_backend.journal_file)
+        print '%6s instance(s) %10.3f ms/tick %10.3f ms/diff %10.3f us/placement %10s bytes/pickle %6s bytes/journal' % (
+            instance_count, tick_time, diff_time, placement_time, pickle_size, journal_size)
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+
+# tracemalloc is only available from Python 3.4 onwards, hence run this benchmark with python3
+from __future__ import print_function
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+# External modules
+from constant import *
+from instance import *
+from zone import *
+
+INSTANCE_COUNT  = 10000
+ZONE_LIST       = ['us-east1-b', 'us-east1-c', 'us-east1-d', 'us-central1-a', 'us-central1-b', 'us-central1-c']
+
+class LegacyInstance:
+    def __init__(self, name=None):
+        self.name = name
+        self.creation_ts = None
+        self.ip = None
+        self.machine_type = None
+        self.preemptible = None
+        self.status = None
+        self.zone = None
+
+        self.flag = INSTANCE_FLAG_NEW
+        self.uptime_hour = 0
+
+class LegacyZone:
+    def __init__(self, name=None):
+        self.name = name
+        self.instance_count = 0
+        self.pe_uptime_hour = 0
+        self.npe_uptime_hour = 0
+        self.total_termination_count = 0
+
+def get_response():
+    # Simulate decoded JSON response where every string is a separate object
+    response = []
+    for index in range(INSTANCE_COUNT):
+        response.append({
+            'name': 'bench-%s' % index,
+            'creationTimestamp': '2016-08-01T00:00:00.000-07:00',
+            'networkInterfaces': [{'networkIP': '10.0.%s.%s' % (index // 256, index % 256)}],
+            'machineType': 'zones/%s/machineTypes/f1-micro' % ZONE_LIST[index % len(ZONE_LIST)],
+            'scheduling': {'preemptible': True},
+            'status': ''.join(['RUN', 'NING']),
+            'zone': 'projects/bench/zones/%s' % ZONE_LIST[index % len(ZONE_LIST)]})
+    return response
+
+def poll(response, instance_class, zone_class, string_filter):
+    # Same conversion as GAPI._dict_to_instance() and Cloud() for every poll
+    instance_list, zone_list = [], {}
+    for _dict in response:
+        instance = instance_class(_dict['name'])
+        instance.creation_ts = _dict['creationTimestamp']
+        instance.ip = _dict['networkInterfaces'][0]['networkIP']
+        instance.machine_type = string_filter(_dict['machineType'].split('/')[-1])
+        instance.preemptible = _dict['scheduling']['preemptible']
+        instance.status = string_filter(_dict['status'])
+        instance.zone = string_filter(_dict['zone'].split('/')[-1])
+        instance_list.append(instance)
+        zone_list.setdefault(instance.zone, zone_class(instance.zone))
+    return instance_list, zone_list
+
+def measure(name, instance_class, zone_class, string_filter):
+    response = get_response()
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    instance_list, zone_list = poll(response, instance_class, zone_class, string_filter)
+    retained_size, peak_size = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocation_count = sum(stat.count for stat in snapshot.statistics('filename'))
+    print('%-24s %8.1f bytes/instance retained, %8.1f KiB peak per poll, %7s live allocation(s)' % (
+        name, float(retained_size) / INSTANCE_COUNT, float(peak_size) / 1024, allocation_count))
+
+if __name__ == "__main__":
+    try:
+        import tracemalloc
+    except ImportError:
+        sys.exit('tracemalloc is not available, run this benchmark with python3')
+
+    print('%s instance(s) per poll' % INSTANCE_COUNT)
+    measure('dict-backed', LegacyInstance, LegacyZone, lambda value: value)
+    measure('__slots__ and interned', Instance, Zone, intern_string)
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+
+# External modules
+from constant import *
+from numpyzoneaggregate import *
+from zone import *
+from zoneaggregate import *
+
+DECISION_COUNT          = 1000
+MIN_ZONE_SPREAD_COUNT   = 3
+TERMINATION_THRESHOLD   = float(1) / 3
+ZONE_COUNT_LIST         = [12, 100, 1000, 10000]
+
+def get_zone_list(zone_count):
+    random.seed(zone_count)
+    zone_list = []
+    for index in range(zone_count):
+        zone = Zone('zone-%s' % index)
+        zone.instance_count = random.randint(0, 10)
+        zone.pe_uptime_hour = random.randint(1, 100)
+        zone.total_termination_count = random.randint(0, 50)
+        zone_list.append(zone)
+    return zone_list
+
+def decide(zone_aggregate, zone_list):
+    # One zone metric update followed by the zone lookups done for a terminated instance
+    for index in range(DECISION_COUNT):
+        zone = zone_list[index % len(zone_list)]
+        zone.pe_uptime_hour += HOUR_PER_SECOND
+        zone_aggregate.update_zone(zone)
+
+        zone_aggregate.get_stable_zone_count()
+        zone_aggregate.get_unstable_zone_count()
+        zone_aggregate.get_zone_candidate(MIN_ZONE_SPREAD_COUNT, PE_AVAILABLE_ZONE_ONLY)
+
+def time_per_decision(zone_aggregate_class, zone_count):
+    zone_list = get_zone_list(zone_count)
+    zone_aggregate = zone_aggregate_class(zone_list, [zone.name for zone in zone_list], TERMINATION_THRESHOLD)
+
+    start_time = time.time()
+    decide(zone_aggregate, zone_list)
+    return (time.time() - start_time) * 1000000 / DECISION_COUNT
+
+if __name__ == "__main__":
+    if numpy is None:
+        sys.exit('NumPy is not installed')
+
+    for zone_count in ZONE_COUNT_LIST:
+        print '%6s zone(s) %10.1f us/decision (heap) %10.1f us/decision (numpy)' % (
+            zone_count, time_per_decision(ZoneAggregate, zone_count), time_per_decision(NumpyZoneAggregate, zone_count))
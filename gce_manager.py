@@ -5,43 +5,59 @@ import socket
 import sys
 import threading
 import time
-from copy import deepcopy
 from datetime import datetime
 from pprint import pprint
 
 # External modules
 from lib.cloud import *
+from lib.clouddiff import *
 from lib.config import *
 from lib.constant import *
+from lib.eventqueue import *
 from lib.gapi import *
+from lib.journal import *
 from lib.logviewer import *
+from lib.numpyzoneaggregate import *
+from lib.operationregistry import *
 from lib.slackbot import *
+from lib.sqlitestate import *
+from lib.snapshot import *
+from lib.statuswatcher import *
 from lib.util import *
+from lib.zoneaggregate import *
 from lib.HTML import *
 
 class GCE_Manager:
     def __init__(self, config_file):
         self.abort_all = False
         self.email_queue = []
-        self.instance_event_list = []
-        self.instance_recovering = 0
+        self.snapshot = Snapshot(0, (), ())
+        self.state_version, self.state_ts = None, 0
+        self.table_cache = {}
+        self.terminated_record_list = []
         self.logviewer = logviewer()
         self.logviewer.hook_logger(DEFAULT_LOGGER_NAME)
 
         self.config = Config(config_file)
         self.slackbot = Slackbot(self.config)
         self.engine = GAPI(self.config, self.slackbot)
+        self.async_engine = self.engine.async_engine
         self.util = Util(DEFAULT_LOGGER_NAME)
+        self.event_queue = EventQueue(EVENT_QUEUE_NAME, self.util.logger.info, self.config.EVENT_WORKER_COUNT)
+        self.recovery_queue = EventQueue(RECOVERY_QUEUE_NAME, self.util.logger.info, self.config.RECOVERY_WORKER_COUNT)
+        self.operation_registry = OperationRegistry()
+        self.state_backend = self.get_state_backend()
 
         all_instance = self.engine.get_all_instance(self.config.ZONE_LIST)
         self.cloud, self.cloud_cache = Cloud(all_instance), self.load_cached_cloud()
+        self.status_watcher = StatusWatcher(self.cloud)
         self.termination_rate_threshold = float(1) / self.config.NON_PREEMPTIBLE_INSTANCE_MIN_ALIVE_HOUR
         self.unstable_zone_threshold = float(len(self.config.ZONE_LIST)) * self.config.PREEMPTIBLE_HIGH_DEMAND_ZONE_THRESHOLD
+        self.zone_aggregate = self.get_zone_aggregate()
 
     def flush_cloud_cache(self):
-        # Flush to filesystem only when no pending instance recovery operation
-        if self.instance_recovering == 0:
-            self.util.save_object(self.config.PROJECT_ID, self.cloud_cache)
+        # Changes are persisted as they happen, including during instance recovery
+        self.state_backend.flush(self.cloud_cache)
 
     def flush_email_queue(self):
         while len(self.email_queue) > 0:
@@ -53,6 +69,15 @@ class GCE_Manager:
         cached_zone = self.cloud_cache.get_zone(zone_name)
         return cached_instance, cached_zone
 
+    def get_cached_table(self, get_table, html=False):
+        # Table is rebuilt only when a newer snapshot is published
+        cache_key, version = (get_table.__name__, html), self.snapshot.version
+        cached_table = self.table_cache.get(cache_key)
+        if cached_table is None or cached_table[0] != version:
+            cached_table = (version, get_table(html))
+            self.table_cache[cache_key] = cached_table
+        return cached_table[1]
+
     def get_config_summary_table(self, html=False):
         config_record = []
 
@@ -73,10 +98,9 @@ class GCE_Manager:
         cost_record = [TABLE_TITLE_COST]
         npe_hour, pe_hour = 0, 0
 
-        for zone_name in self.config.ZONE_LIST:
-            cached_zone = self.cloud_cache.get_zone(zone_name)
-            npe_hour += cached_zone.npe_uptime_hour
-            pe_hour += cached_zone.pe_uptime_hour
+        for zone_record in self.snapshot.zone_list:
+            npe_hour += zone_record.npe_uptime_hour
+            pe_hour += zone_record.pe_uptime_hour
 
         npe_pricing, pe_pricing = GCE_PRICING_TABLE[self.config.MACHINE_TYPE]
         npe_total, pe_total = npe_pricing * npe_hour, pe_pricing * pe_hour
@@ -98,10 +122,10 @@ class GCE_Manager:
     def get_html_summary_report(self):
         log_buffer = self.logviewer.get_log_buffer(REPORT_LOG_COUNT)
         params = (  HTML_LINE_BREAK_TAG.join(log_buffer),
-                    self.get_cost_summary_table(True),
-                    self.get_zone_summary_table(True),
-                    self.get_instance_summary_table(True),
-                    self.get_config_summary_table(True),
+                    self.get_cached_table(self.get_cost_summary_table, True),
+                    self.get_cached_table(self.get_zone_summary_table, True),
+                    self.get_cached_table(self.get_instance_summary_table, True),
+                    self.get_cached_table(self.get_config_summary_table, True),
                     DEFAULT_EMAIL_FOOTER   )
 
         return REPORT_TEMPLATE % params
@@ -109,7 +133,7 @@ class GCE_Manager:
     def get_instance_summary_table(self, html=False):
         instance_record = [TABLE_TITLE_INSTANCE]
 
-        for instance in self.cloud_cache.get_instance_list():
+        for instance in self.snapshot.instance_list:
             node = instance.name
             for prefix in self.config.INSTANCE_NAME_PREFIX_LIST:
                 node = node.replace(prefix, '')
@@ -125,13 +149,24 @@ class GCE_Manager:
 
         return str(table(instance_record)) if html else instance_record
 
+    def get_metric_summary_table(self, html=False):
+        metric_record = [TABLE_TITLE_METRIC]
+
+        metric_list = self.engine.get_metric_list() + self.event_queue.get_metric_list() + self.recovery_queue.get_metric_list()
+        metric_list += self.operation_registry.get_metric_list() + self.status_watcher.get_metric_list()
+        for metric_name, value in metric_list:
+            metric_record.append([metric_name, str(value)])
+
+        return str(table(metric_record)) if html else metric_record
+
     def get_sorted_zone_table(self, sortkey_index, include_low_preemptible_supply_zone):
         unsorted_zone_table, sorted_zone_table = [], []
 
         # Prepare a list of tuples with [instance_count, zone_name]
         for zone in self.cloud_cache.get_zone_list():
             if not self.low_preemptible_supply(zone.name) or include_low_preemptible_supply_zone:
-                unsorted_zone_table.append([zone.instance_count, zone.name, zone.get_termination_rate(), zone.get_total_uptime_hour()])
+                termination_rate = self.zone_aggregate.get_termination_rate(zone.name)
+                unsorted_zone_table.append([zone.instance_count, zone.name, termination_rate, zone.get_total_uptime_hour()])
 
         def get_key(item):
             return item[sortkey_index]
@@ -142,62 +177,48 @@ class GCE_Manager:
 
         return sorted_zone_table
 
-    def get_unstable_zone_count(self):
-        unstable_zone_count = 0
+    def get_state_backend(self):
+        # Invalid state backend is reported by validate_rules()
+        if self.config.STATE_BACKEND == STATE_BACKEND_SQLITE:
+            return SQLiteState(self.config.PROJECT_ID, self.util)
+        else:
+            return Journal(self.config.PROJECT_ID, self.util)
 
-        for zone_info in self.get_zone_info_list():
-            zone_name, instance_count, zone_total_uptime_hour, termination_count, termination_rate = zone_info
-            unstable_zone_count += 1 if (termination_rate > self.termination_rate_threshold) else 0
+    def get_unstable_zone_count(self):
+        return self.zone_aggregate.get_unstable_zone_count()
+
+    def get_zone_aggregate(self):
+        # Vectorised zone scoring is optional, fall back to incremental aggregate when NumPy is not installed
+        zone_aggregate_class = ZoneAggregate
+        if self.config.NUMPY_ZONE_SCORING:
+            if numpy is not None:
+                zone_aggregate_class = NumpyZoneAggregate
+            else:
+                self.util.logger.info(NUMPY_MISSING_MESSAGE)
 
-        return unstable_zone_count
+        # Invalid termination rate window is reported by validate_rules()
+        window = self.config.TERMINATION_RATE_WINDOW if self.config.TERMINATION_RATE_WINDOW in RATE_WINDOW_LIST else RATE_WINDOW_LIFETIME
+        return zone_aggregate_class(self.cloud_cache.get_zone_list(), self.config.ZONE_LIST, self.termination_rate_threshold, window)
 
     def get_zone_candidate(self, instance):
-        zone_candidate_table, unique_instance_count_list = [], []
-        _zone_name, _instance_count, _termination_rate = None, 0, 0
-        instance_count_sorted_zone_table = self.get_sorted_zone_table(INDEX_INSTANCE_COUNT, PE_AVAILABLE_ZONE_ONLY)
-
         # Pick zone(s) with lower instance count to prioritize zone spread balance followed by termination rate
-        for zone_name, instance_count, termination_rate, zone_total_uptime_hour in instance_count_sorted_zone_table:
-            # Pick zone(s) with unique instance count up to the number of minimum zone spread
-            if len(unique_instance_count_list) < self.config.MIN_ZONE_SPREAD_COUNT:
-                zone_candidate_table.append([zone_name, instance_count, termination_rate])
-                if not instance_count in unique_instance_count_list:
-                    unique_instance_count_list.append(instance_count)
-
-        # Pick the zone with lowest termination rate from zone_candidate_table
-        for zone_name, instance_count, termination_rate in zone_candidate_table:
-            # Pick zone record with lower instance termination rate
-            if _zone_name == None or _termination_rate > termination_rate:
-                _zone_name, _instance_count, _termination_rate = zone_name, instance_count, termination_rate
-            # When zone record having same termination rate, pick the one with lower instance count
-            elif _termination_rate == termination_rate:
-                if _instance_count > instance_count:
-                    _zone_name, _instance_count, _termination_rate = zone_name, instance_count, termination_rate
-
-        return _zone_name
+        return self.zone_aggregate.get_zone_candidate(self.config.MIN_ZONE_SPREAD_COUNT, PE_AVAILABLE_ZONE_ONLY)
 
     def get_zone_info_list(self):
         zone_info_list = []
 
-        for zone_name in self.config.ZONE_LIST:
-            cached_zone = self.cloud_cache.get_zone(zone_name)
+        for zone_record in self.snapshot.zone_list:
             zone_info_list.append(
-                (zone_name,
-                self.get_zone_instance_count(zone_name),
-                cached_zone.get_total_uptime_hour(),
-                cached_zone.total_termination_count,
-                cached_zone.get_termination_rate()))
+                (zone_record.name,
+                zone_record.instance_count,
+                zone_record.pe_uptime_hour + zone_record.npe_uptime_hour,
+                zone_record.total_termination_count,
+                zone_record.termination_rate))
 
         return zone_info_list
 
     def get_zone_instance_count(self, zone_name):
-        instance_count = 0
-
-        for instance in self.cloud.get_instance_list():
-            if instance.zone == zone_name:
-                instance_count += 1
-
-        return instance_count
+        return self.cloud.get_instance_count(zone_name)
 
     def get_zone_summary_table(self, html=False):
         zone_configured = [TABLE_TITLE_ZONE]
@@ -217,9 +238,8 @@ class GCE_Manager:
         while not self.abort_all:
             start_time = datetime.utcnow()
             try:
-                self.instance_event_generator()
                 self.update_cloud_metric()
-                self.flush_cloud_cache()
+                self.refresh_state()
                 threading.Thread(target=self.flush_email_queue).start()
             except Exception, exception:
                 content = API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception)
@@ -227,11 +247,6 @@ class GCE_Manager:
             finally:
                 time.sleep(self.get_cooldown_time(start_time))
 
-    def instance_event_generator(self):
-        while len(self.instance_event_list) > 0:
-            _target, _instance = self.instance_event_list.pop(0)
-            threading.Thread(target=_target, args=(_instance,)).start()
-
     def instance_matured(self, instance):
         pe_matured = (instance.flag != INSTANCE_FLAG_MATURED and instance.uptime_hour >= INSTANCE_MATURITY_HOUR)
         npe_matured = instance.uptime_hour > self.config.NON_PREEMPTIBLE_INSTANCE_MIN_ALIVE_HOUR
@@ -250,7 +265,12 @@ class GCE_Manager:
         while not self.abort_all:
             start_time = datetime.utcnow()
             try:
-                self.cloud = Cloud(self.engine.get_all_instance(self.config.ZONE_LIST))
+                all_instance = self.engine.get_all_instance(self.config.ZONE_LIST)
+
+                # Keep previous instance status when polling failed instead of treating all instance(s) as deleted
+                if all_instance != None:
+                    self.cloud = Cloud(all_instance)
+                    self.status_watcher.update(self.cloud)
             except Exception, exception:
                 content = API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception)
                 self.email_queue.append((content, self.config.EMAIL_RECIPIENT_LIST, ERROR_THREAD_CRASHED))
@@ -258,8 +278,7 @@ class GCE_Manager:
                 time.sleep(self.get_cooldown_time(start_time, max_cooldown=API_POLLING_INTERVAL))
 
     def load_cached_cloud(self):
-        cloud_cache = self.util.load_object(self.config.PROJECT_ID)
-        cloud_cache = Cloud() if cloud_cache == None else cloud_cache
+        cloud_cache = self.state_backend.load()
 
         # Add any newly configured zone into local cache
         for zone_name in self.config.ZONE_LIST:
@@ -279,12 +298,10 @@ class GCE_Manager:
 
     def low_preemptible_supply(self, zone_name=None):
         if zone_name != None:
-            termination_rate = self.cloud_cache.get_zone(zone_name).get_termination_rate()
-            return termination_rate > self.termination_rate_threshold
+            return self.zone_aggregate.is_unstable(zone_name)
         else:
-            # Get zone(s) with available preemptible instance supply sorted by termination rate
-            termination_rate_sorted_zone_table = self.get_sorted_zone_table(INDEX_TERMINATION_RATE, PE_AVAILABLE_ZONE_ONLY)
-            available_zone_count = len(termination_rate_sorted_zone_table)
+            # Get number of zone(s) with available preemptible instance supply
+            available_zone_count = self.zone_aggregate.get_stable_zone_count()
             min_zone_spread_count_satisfied = (available_zone_count >= self.config.MIN_ZONE_SPREAD_COUNT)
             stable_zone_available = (available_zone_count > 0) and min_zone_spread_count_satisfied
             overall_pe_supply_low = self.get_unstable_zone_count() > self.unstable_zone_threshold
@@ -292,17 +309,17 @@ class GCE_Manager:
             # Return overall zone count availability status if there's stable zone available
             return overall_pe_supply_low if stable_zone_available else True
 
+    def notify_terminated_instance(self):
+        # Report sent with each termination reflects the published snapshot, it is built once per tick
+        while len(self.terminated_record_list) > 0:
+            self.on_instance_terminated_notification(self.terminated_record_list.pop(0))
+
     def on_instance_created_notification(self, created_instance):
         self.log(MESSAGE_CREATED % self.get_event_message_param(created_instance))
 
     def on_instance_deleted_notification(self, deleted_instance):
         self.log(MESSAGE_DELETED % self.get_event_message_param(deleted_instance, True))
 
-    def on_instance_running_notification(self, running_instance):
-        # FOR DEBUGGING USE ONLY
-        # self.log(MESSAGE_RUNNING % self.get_event_message_param(running_instance, True))
-        return
-
     def on_instance_started_notification(self, started_instance):
         self.log(MESSAGE_STARTED % self.get_event_message_param(started_instance), send_email=True)
 
@@ -334,70 +351,102 @@ class GCE_Manager:
                     self.log(MESSAGE_PE_HIGH_DEMAND)
                     self.log(MESSAGE_CONVERT_NPE % params, send_email=True)
 
-        self.instance_event_list.append((self.process_terminated_instance, terminated_instance))
+        self.submit_operation(terminated_instance.name, OPERATION_RECOVER, self.process_terminated_instance, terminated_instance)
 
     # TODO: Check and don't recreate instance if it is deleted on purpose - for instance_restructure_engine()
     def process_terminated_instance(self, terminated_instance):
-        self.instance_recovering += 1
-
-        # Wait until terminated instance is fully stopped
-        while self.cloud.get_instance(terminated_instance.name).status != GCE_STATUS_TERMINATED:
-            time.sleep(1)
+        # Wait until terminated instance is fully stopped, woken up by the poll observing it
+        if not self.wait_for_terminated_instance(terminated_instance):
+            return
 
         # Convert non-preemptible instance to preemptible instance
         if not terminated_instance.preemptible:
-            self.recover_instance(terminated_instance, PREEMPTIBLE, terminated_instance.zone)
+            return self.recover_instance(terminated_instance, PREEMPTIBLE, terminated_instance.zone)
         else:
             # Strategy 1: Recycling instance
             if terminated_instance.flag != INSTANCE_FLAG_RECYCLED:
-                self.recover_instance(terminated_instance, PREEMPTIBLE, terminated_instance.zone)
+                return self.recover_instance(terminated_instance, PREEMPTIBLE, terminated_instance.zone)
             else:
                 if not self.low_preemptible_supply():
                     # Strategy 2: Relocate instance only if zone candidate is in different zone
                     # Otherwise recreate it as non-preemptible instance in the same zone
-                    zone_candidate = self.get_zone_candidate(terminated_instance)
+                    zone_candidate = self.reserve_zone_candidate(terminated_instance, self.config.MIN_ZONE_SPREAD_COUNT, PE_AVAILABLE_ZONE_ONLY)
                     preemptibility = PREEMPTIBLE if (zone_candidate != terminated_instance.zone) else NON_PREEMPTIBLE
-                    self.recover_instance(terminated_instance, preemptibility, zone_candidate)
+                    return self.recover_instance(terminated_instance, preemptibility, zone_candidate)
                 else:
-                    # Pick zone with the least instance count which is the first entry
-                    instance_count_sorted_zone_table = self.get_sorted_zone_table(INDEX_INSTANCE_COUNT, ALL_ZONE)
-                    zone_name, instance_count, termination_rate, zone_total_uptime_hour = instance_count_sorted_zone_table[0]
+                    # Pick zone with the least instance count
+                    zone_name = self.reserve_zone_candidate(terminated_instance, 1, ALL_ZONE)
 
                     # Strategy 3: Convert instance to non-preemptible instance
-                    self.recover_instance(terminated_instance, NON_PREEMPTIBLE, zone_name)
+                    return self.recover_instance(terminated_instance, NON_PREEMPTIBLE, zone_name)
 
-        self.instance_recovering -= 1
+    def publish_snapshot(self):
+        zone_list = []
 
-    def recover_instance(self, instance, preemptible, zone_name):
-        # Update instance count when source and destination zones are different
-        if instance.zone != zone_name:
-            source_zone = self.cloud_cache.get_zone(instance.zone)
-            destination_zone = self.cloud_cache.get_zone(zone_name)
-            source_zone.instance_count -= 1
-            destination_zone.instance_count += 1
-            self.cloud_cache.update_zone(source_zone)
-            self.cloud_cache.update_zone(destination_zone)
+        for zone_name in self.config.ZONE_LIST:
+            cached_zone = self.cloud_cache.get_zone(zone_name)
+            zone_list.append(ZoneRecord(
+                zone_name,
+                self.get_zone_instance_count(zone_name),
+                cached_zone.pe_uptime_hour,
+                cached_zone.npe_uptime_hour,
+                cached_zone.total_termination_count,
+                self.zone_aggregate.get_termination_rate(zone_name)))
 
+        # Readers hold on to the previous snapshot until they fetch self.snapshot again
+        instance_list = tuple(get_instance_record(instance) for instance in self.cloud_cache.get_instance_list())
+        self.snapshot = Snapshot(self.snapshot.version + 1, instance_list, tuple(zone_list))
+
+    def recover_instance(self, instance, preemptible, zone_name):
         # Start back the same instance if same preemptibility type and zone
+        # Returned future is resolved when recovery is done, recovery worker is not held meanwhile
         if instance.preemptible == preemptible and instance.zone == zone_name:
-            self.engine.start_instance(zone_name, instance.name)
+            return self.async_engine.wait_for_mutation(zone_name, self.async_engine.start_instance(zone_name, instance.name))
         else:
             # The zone and preemptible option cannot be changed after instance creation, hence recreate instance
-            response = self.engine.delete_instance(instance.zone, instance.name)
-            self.engine.wait_for_operation(instance.zone, response)
-            self.engine.create_instance_from_snapshot(zone_name, instance.name, preemptible)
+            instance_deleted = self.async_engine.wait_for_mutation(instance.zone, self.async_engine.delete_instance(instance.zone, instance.name))
+            return self.async_engine.chain(instance_deleted, lambda done_future: self.async_engine.create_instance_from_snapshot(zone_name, instance.name, preemptible))
+
+    def refresh_state(self):
+        # Snapshot and state are refreshed on change only, uptime only drift is refreshed at a coarser interval
+        uptime_refresh_due = (time.time() - self.state_ts) >= self.config.UPTIME_REFRESH_INTERVAL
+        if self.cloud_cache.change_version != self.state_version or uptime_refresh_due:
+            self.state_version, self.state_ts = self.cloud_cache.change_version, time.time()
+            self.publish_snapshot()
+            self.flush_cloud_cache()
+        self.notify_terminated_instance()
+
+    def reserve_zone_candidate(self, instance, min_zone_spread_count, include_low_preemptible_supply_zone):
+        # Instance count is moved to zone candidate on pick, hence simultaneous relocation(s) spread across zones
+        return self.zone_aggregate.reserve_zone_candidate(instance.zone, min_zone_spread_count, include_low_preemptible_supply_zone)
+
+    def run_operation(self, instance_name, token, target, args):
+        if self.operation_registry.start(instance_name, token):
+            future = None
+            try:
+                future = target(*args)
+            finally:
+                # Operation returning a future stays in flight until it is resolved, without holding the worker
+                if isinstance(future, Future):
+                    future.add_done_callback(lambda future: self.operation_registry.finish(instance_name, token))
+                else:
+                    self.operation_registry.finish(instance_name, token)
 
     def shutdown(self, message=None):
         if not self.abort_all:
             if message is not None:
                 self.log(message)
             self.abort_all = True
+            self.event_queue.shutdown()
+            self.recovery_queue.shutdown()
             self.engine.shutdown()
             self.slackbot.shutdown()
 
     def start(self):
         self.update_cloud_metric()
         self.update_zone_instance_count()
+        self.publish_snapshot()
+        self.notify_terminated_instance()
         self.log(STARTUP_MESSAGE % self.config.PROJECT_ID, send_email=True)
 
         if self.validate_rules():
@@ -420,53 +469,79 @@ class GCE_Manager:
             while not self.abort_all: time.sleep(1)
         self.shutdown()
 
+    def stop_instance(self, zone_name, instance_name):
+        # Stop stays in flight until instance is polled out of RUNNING, its operation being done is not enough as
+        # update_running_instance_metric() would request another stop until the next poll, failed stop is released at once
+        def watch_stopped(stop_future):
+            if stop_future.exception is not None or stop_future.value is None:
+                return stop_future
+            return self.status_watcher.watch(instance_name, lambda status: status != GCE_STATUS_RUNNING, STATUS_WAIT_MAX_SECOND)
+
+        stop_future = self.async_engine.wait_for_mutation(zone_name, self.async_engine.stop_instance(zone_name, instance_name))
+        return self.async_engine.chain(stop_future, watch_stopped)
+
+    def submit_operation(self, instance_name, intent, target, *args):
+        # Duplicate intent for an instance with operation pending or running is dropped here
+        token = self.operation_registry.register(instance_name, intent)
+        if token is not None:
+            self.recovery_queue.put(self.run_operation, instance_name, token, target, args)
+
     def update_cloud_cache(self, instance, zone):
         self.cloud_cache.update_instance(instance)
         self.cloud_cache.update_zone(zone)
 
     def update_cloud_metric(self):
-        for cached_instance in self.cloud_cache.get_instance_list():
-            # Instance deleted event
-            if not self.cloud.has_instance(cached_instance.name):
-                self.cloud_cache.delete_instance(cached_instance.name)
-                self.instance_event_list.append((self.on_instance_deleted_notification, cached_instance))
-
-        for live_instance in self.cloud.get_instance_list():
-            # Instance created event
-            if not self.cloud_cache.has_instance(live_instance.name):
+        for event in CloudDiff(self.cloud_cache, self.cloud).get_event_list():
+            live_instance = event.instance
+
+            if event.event_type == EVENT_DELETED:
+                self.cloud_cache.delete_instance(live_instance.name)
+                self.state_backend.delete_instance(live_instance.name)
+                self.event_queue.put(self.on_instance_deleted_notification, live_instance)
+            elif event.event_type == EVENT_CREATED:
                 self.cloud_cache.add_instance(Instance(live_instance.name))
-                self.instance_event_list.append((self.on_instance_created_notification, live_instance))
+                self.event_queue.put(self.on_instance_created_notification, live_instance)
+            else:
+                # Load instance and zone previous state from cache
+                cached_instance, cached_zone = self.get_cached_cloud(live_instance.name, live_instance.zone)
+                cached_flag = cached_instance.flag
+                live_instance.flag, live_instance.uptime_hour = cached_instance.flag, cached_instance.uptime_hour
+                live_instance.accounted_ts = cached_instance.accounted_ts
+
+                if event.event_type == EVENT_STARTED:
+                    live_instance = self.update_started_instance_metric(live_instance)
+                elif event.event_type == EVENT_RUNNING:
+                    cached_zone, live_instance = self.update_running_instance_metric(cached_zone, live_instance)
+                elif event.event_type == EVENT_TERMINATED:
+                    cached_zone, live_instance = self.update_terminated_instance_metric(cached_zone, live_instance)
 
-            # Load instance and zone previous state from cache
-            cached_instance, cached_zone = self.get_cached_cloud(live_instance.name, live_instance.zone)
-            live_instance.flag, live_instance.uptime_hour = cached_instance.flag, cached_instance.uptime_hour
+                self.update_cloud_cache(live_instance, cached_zone)
 
-            # Instance started event
-            if cached_instance.status != GCE_STATUS_RUNNING and live_instance.status == GCE_STATUS_RUNNING:
-                live_instance = self.update_started_instance_metric(live_instance)
-            # Instance running event
-            elif cached_instance.status == GCE_STATUS_RUNNING and live_instance.status == GCE_STATUS_RUNNING:
-                cached_zone, live_instance = self.update_running_instance_metric(cached_zone, live_instance)
-            # Instance terminated event
-            elif cached_instance.status == GCE_STATUS_RUNNING and live_instance.status != GCE_STATUS_RUNNING:
-                cached_zone, live_instance = self.update_terminated_instance_metric(cached_instance, cached_zone, live_instance)
+                # Uptime of running instance is recovered from accounted_ts, hence persist only other change(s)
+                if event.event_type != EVENT_RUNNING or live_instance.flag != cached_flag:
+                    self.state_backend.update_instance(self.cloud_cache.get_instance(live_instance.name))
 
-            self.update_cloud_cache(live_instance, cached_zone)
+        # Refresh zone aggregate once per tick, windowed termination rate changes even without instance event
+        for cached_zone in self.cloud_cache.get_zone_list():
+            self.zone_aggregate.update_zone(cached_zone)
 
     def update_running_instance_metric(self, cached_zone, live_instance):
+        # Instance restarted while GCE Manager was not running, count uptime from its last start only
+        timestamp_known = (live_instance.start_ts is not None and live_instance.accounted_ts is not None)
+        if timestamp_known and live_instance.start_ts > live_instance.accounted_ts:
+            live_instance.uptime_hour, live_instance.accounted_ts = 0, live_instance.start_ts
+
         # Update instance uptime_hour and zone uptime_hour
-        live_instance.uptime_hour += HOUR_PER_SECOND
-        cached_zone.pe_uptime_hour += HOUR_PER_SECOND if live_instance.preemptible else 0
-        cached_zone.npe_uptime_hour += HOUR_PER_SECOND if not live_instance.preemptible else 0
+        self.update_uptime(cached_zone, live_instance)
 
         # Trigger stop if instance is non-preemptible and matured, else continue running
         live_instance.flag = INSTANCE_FLAG_MATURED if self.instance_matured(live_instance) else live_instance.flag
         non_preemptible_matured = (not live_instance.preemptible and live_instance.flag == INSTANCE_FLAG_MATURED)
 
+        # Running instance without state change has nothing to notify, no event is queued for it
+        # Stop is requested on every tick until instance is seen stopped, registry lets only one of them through
         if non_preemptible_matured:
-            threading.Thread(target=self.engine.stop_instance, args=(live_instance.zone, live_instance.name,)).start()
-        else:
-            self.instance_event_list.append((self.on_instance_running_notification, live_instance))
+            self.submit_operation(live_instance.name, OPERATION_STOP, self.stop_instance, live_instance.zone, live_instance.name)
 
         return cached_zone, live_instance
 
@@ -474,10 +549,11 @@ class GCE_Manager:
         while not self.abort_all:
             start_time = datetime.utcnow()
             try:
-                self.slackbot.config_table = self.get_config_summary_table()
-                self.slackbot.cost_table = self.get_cost_summary_table()
-                self.slackbot.instance_table = self.get_instance_summary_table()
-                self.slackbot.zone_table = self.get_zone_summary_table()
+                self.slackbot.config_table = self.get_cached_table(self.get_config_summary_table)
+                self.slackbot.cost_table = self.get_cached_table(self.get_cost_summary_table)
+                self.slackbot.instance_table = self.get_cached_table(self.get_instance_summary_table)
+                self.slackbot.metric_table = self.get_metric_summary_table()
+                self.slackbot.zone_table = self.get_cached_table(self.get_zone_summary_table)
             except Exception, exception:
                 content = API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception)
                 self.email_queue.append((content, self.config.EMAIL_RECIPIENT_LIST, ERROR_THREAD_CRASHED))
@@ -485,24 +561,31 @@ class GCE_Manager:
                 time.sleep(self.get_cooldown_time(start_time))
 
     def update_started_instance_metric(self, live_instance):
-        # Reset instance uptime_hour when it is started
+        # Reset instance uptime_hour when it is started, count uptime from its start time if it was seen stopped before
         live_instance.uptime_hour = 0
-        self.instance_event_list.append((self.on_instance_started_notification, live_instance))
+        if live_instance.accounted_ts is not None and live_instance.start_ts is not None:
+            live_instance.accounted_ts = max(live_instance.accounted_ts, live_instance.start_ts)
+        else:
+            live_instance.accounted_ts = time.time()
+        self.event_queue.put(self.on_instance_started_notification, live_instance)
 
         return live_instance
 
-    def update_terminated_instance_metric(self, cached_instance, cached_zone, live_instance):
-        # Increment zone total termination count if instance gets terminated before maturity
-        cached_zone.total_termination_count += (1 if live_instance.flag != INSTANCE_FLAG_MATURED else 0)
+    def update_terminated_instance_metric(self, cached_zone, live_instance):
+        # Account uptime until termination is observed
+        self.update_uptime(cached_zone, live_instance)
 
-        # Update cached instance with current instance status to reflect correctly in instance list
-        cached_instance.status = live_instance.status
+        # Increment zone total termination count if instance gets terminated before maturity
+        if live_instance.flag != INSTANCE_FLAG_MATURED:
+            cached_zone.total_termination_count += 1
+            cached_zone.window.add_termination(live_instance.accounted_ts)
+            self.state_backend.add_termination(cached_zone.name, live_instance.accounted_ts)
 
-        # Update cloud cache to ensure report reflects current instance status and zone termination rate
-        self.update_cloud_cache(cached_instance, cached_zone)
+        # Zone termination count is changed in place on cached zone
+        self.cloud_cache.set_changed()
 
-        # Trigger notification synchronously to show flag before update
-        self.on_instance_terminated_notification(deepcopy(live_instance))
+        # Notification is sent once this tick's snapshot is published, with an immutable record to show flag before update
+        self.terminated_record_list.append(get_instance_record(live_instance))
 
         # Update to proper flag after an instance termination
         pe_instance_flag = INSTANCE_FLAG_RECYCLED if live_instance.flag == INSTANCE_FLAG_NEW else INSTANCE_FLAG_NEW
@@ -510,19 +593,22 @@ class GCE_Manager:
 
         return cached_zone, live_instance
 
-    def update_zone_instance_count(self):
-        unique_zone_list = []
+    def update_uptime(self, cached_zone, live_instance):
+        # Uptime is the time elapsed since last accounted, independent of how often it is called
+        current_ts = time.time()
+        accounted_ts = live_instance.accounted_ts if live_instance.accounted_ts is not None else current_ts
+        uptime_hour = (current_ts - accounted_ts) * HOUR_PER_SECOND if current_ts > accounted_ts else 0
 
-        for instance in self.cloud.get_instance_list():
-            cached_zone = self.cloud_cache.get_zone(instance.zone)
+        live_instance.uptime_hour += uptime_hour
+        live_instance.accounted_ts = current_ts
+        cached_zone.window.add_uptime(accounted_ts, current_ts)
+        cached_zone.pe_uptime_hour += uptime_hour if live_instance.preemptible else 0
+        cached_zone.npe_uptime_hour += uptime_hour if not live_instance.preemptible else 0
 
-            if cached_zone.name not in unique_zone_list:
-                cached_zone.instance_count = 1
-                unique_zone_list.append(cached_zone.name)
-            else:
-                cached_zone.instance_count += 1
-
-            self.cloud_cache.update_zone(cached_zone)
+    def update_zone_instance_count(self):
+        # Live cloud only holds zone(s) with at least one instance
+        for zone in self.cloud.get_zone_list():
+            self.zone_aggregate.set_instance_count(zone.name, self.cloud.get_instance_count(zone.name))
 
     def validate_rules(self):
         if self.config.MIN_INSTANCE_COUNT < self.config.MIN_ZONE_SPREAD_COUNT:
@@ -531,9 +617,38 @@ class GCE_Manager:
         elif len(self.config.ZONE_LIST) < self.config.MIN_ZONE_SPREAD_COUNT:
             self.log(ERR_ZONES_LESSER_THAN_ZONE_SPREAD)
             return False
+        elif self.config.TERMINATION_RATE_WINDOW not in RATE_WINDOW_LIST:
+            self.log(ERR_INVALID_RATE_WINDOW)
+            return False
+        elif self.config.STATE_BACKEND not in STATE_BACKEND_LIST:
+            self.log(ERR_INVALID_STATE_BACKEND)
+            return False
+        elif self.config.UPTIME_REFRESH_INTERVAL <= 0:
+            self.log(ERR_INVALID_UPTIME_REFRESH)
+            return False
+        elif min(self.config.EVENT_WORKER_COUNT, self.config.RECOVERY_WORKER_COUNT) <= 0:
+            self.log(ERR_INVALID_WORKER_COUNT)
+            return False
         else:
             return True
 
+    def wait_for_terminated_instance(self, terminated_instance):
+        start_time = time.time()
+
+        while not self.status_watcher.wait_for_status(terminated_instance.name, GCE_STATUS_TERMINATED, STATUS_WAIT_TIMEOUT):
+            if self.abort_all:
+                return False
+
+            # Give up when instance is deleted, started again or never stopped, so its recovery can be registered again
+            live_instance = self.cloud.get_instance(terminated_instance.name)
+            instance_deleted = not self.cloud.has_instance(terminated_instance.name)
+            wait_expired = (time.time() - start_time) >= STATUS_WAIT_MAX_SECOND
+            if instance_deleted or live_instance.status == GCE_STATUS_RUNNING or wait_expired:
+                self.log(MESSAGE_SKIP_RECOVERY % (self.get_event_message_param(terminated_instance) + (live_instance.status,)))
+                return False
+
+        return True
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print USAGE_MESSAGE
@@ -0,0 +1,109 @@
+import threading
+import time
+
+# External modules
+from constant import *
+from workerpool import *
+
+class AsyncGAPI:
+    def __init__(self, engine, logger):
+        # Mutation(s) go through the mutation batcher and operation(s) through the operation tracker, no thread is held while waiting
+        self.engine = engine
+        self.log = logger
+
+    def _submit_mutation(self, operation_name, request_builder):
+        # Request is built once on caller thread, retry is scheduled on a timer instead of sleeping on a worker
+        future, start_time = Future(), time.time()
+        try:
+            request = request_builder(self.engine.client_pool.get_client())
+        except Exception, exception:
+            self.log(API_FAILURE_MESSAGE % (operation_name, exception))
+            future.set_exception(exception)
+            return future
+
+        def submit(attempt):
+            self.engine.mutation_batcher.submit(request).add_done_callback(lambda mutation_future: on_done(mutation_future, attempt))
+
+        def on_done(mutation_future, attempt):
+            if mutation_future.exception is None:
+                future.set_result(mutation_future.value)
+                return
+
+            delay = self.engine.retry_policy.get_retry_delay(operation_name, mutation_future.exception, attempt, start_time)
+            if delay is None:
+                future.set_exception(mutation_future.exception)
+            else:
+                timer = threading.Timer(delay, submit, (attempt + 1,))
+                timer.daemon = True
+                timer.start()
+
+        submit(0)
+        return future
+
+    def chain(self, future, next_target):
+        # Future resolved by the future next_target() returns once the given future is done
+        chained_future = Future()
+
+        def on_next_done(next_future):
+            if next_future.exception is not None:
+                chained_future.set_exception(next_future.exception)
+            else:
+                chained_future.set_result(next_future.value)
+
+        def on_done(done_future):
+            try:
+                next_target(done_future).add_done_callback(on_next_done)
+            except Exception, exception:
+                chained_future.set_exception(exception)
+
+        future.add_done_callback(on_done)
+        return chained_future
+
+    def create_disk_from_snapshot(self, zone, disk_name):
+        config = self.engine.get_disk_config(zone, disk_name)
+        return self._submit_mutation('create_disk_from_snapshot', lambda compute: compute.disks().insert(
+            project=self.engine.config.PROJECT_ID, zone=zone, body=config))
+
+    def create_instance(self, zone, instance_name, disk_name, preemptible):
+        config = self.engine.get_instance_config(zone, instance_name, disk_name, preemptible)
+        return self._submit_mutation('create_instance', lambda compute: compute.instances().insert(
+            project=self.engine.config.PROJECT_ID, zone=zone, body=config))
+
+    def create_instance_from_snapshot(self, zone, instance_name, preemptible):
+        def wait_for_disk(disk_future):
+            # Instance is still created when disk creation failed, disk may exist from an earlier attempt
+            if disk_future.exception is not None:
+                self.log(API_FAILURE_MESSAGE % ('create_disk_from_snapshot', 'Skipped'))
+                return self.wait_for_operation(zone, None)
+            return self.wait_for_operation(zone, disk_future.value)
+
+        disk_ready = self.chain(self.create_disk_from_snapshot(zone, instance_name), wait_for_disk)
+        return self.chain(disk_ready, lambda done_future: self.create_instance(zone, instance_name, instance_name, preemptible))
+
+    def delete_instance(self, zone, instance_name):
+        return self._submit_mutation('delete_instance', lambda compute: compute.instances().delete(
+            project=self.engine.config.PROJECT_ID, zone=zone, instance=instance_name))
+
+    def list_instance(self, zone):
+        # Paginated listing is sequential, it runs on the poll worker pool
+        return self.engine.worker_pool.submit(self.engine.list_instance, zone)
+
+    def start_instance(self, zone, instance_name):
+        return self._submit_mutation('start_instance', lambda compute: compute.instances().start(
+            project=self.engine.config.PROJECT_ID, zone=zone, instance=instance_name))
+
+    def stop_instance(self, zone, instance_name):
+        return self._submit_mutation('stop_instance', lambda compute: compute.instances().stop(
+            project=self.engine.config.PROJECT_ID, zone=zone, instance=instance_name))
+
+    def wait_for_mutation(self, zone, mutation_future):
+        # Resolved once the operation started by the mutation is done
+        return self.chain(mutation_future, lambda done_future: self.wait_for_operation(zone, done_future.result()))
+
+    def wait_for_operation(self, zone, op_response):
+        # Operation tracker resolves the future itself, no worker is held while waiting
+        if op_response is None:
+            future = Future()
+            future.set_result(None)
+            return future
+        return self.engine.operation_tracker.register(zone, op_response)
@@ -0,0 +1,61 @@
+import threading
+
+# External modules
+from constant import *
+
+class BaseZoneAggregate:
+    def __init__(self, zone_list, configured_zone_list, termination_rate_threshold, termination_rate_window):
+        # Locking and reservation are shared, engine only implements _refresh(), _pick_zone_candidate() and rate lookup(s)
+        self.configured_zone_set = set(configured_zone_list)
+        self.lock = threading.Lock()
+        self.termination_rate_threshold = termination_rate_threshold
+        self.termination_rate_window = termination_rate_window
+        self.zone_map = {}
+
+        for zone in zone_list:
+            self.add_zone(zone)
+
+    def _move_instance(self, source_zone_name, destination_zone_name):
+        for zone_name, instance_count_change in [(source_zone_name, -1), (destination_zone_name, 1)]:
+            if zone_name in self.zone_map:
+                self.zone_map[zone_name].instance_count += instance_count_change
+                self._refresh(self.zone_map[zone_name])
+
+    def _pick_zone_candidate(self, min_zone_spread_count, include_unstable_zone):
+        raise NotImplementedError
+
+    def _refresh(self, zone):
+        raise NotImplementedError
+
+    def add_zone(self, zone):
+        with self.lock:
+            self.zone_map[zone.name] = zone
+            self._refresh(zone)
+
+    def get_instance_count(self, zone_name):
+        zone = self.zone_map.get(zone_name)
+        return zone.instance_count if zone is not None else 0
+
+    def get_zone_candidate(self, min_zone_spread_count, include_unstable_zone):
+        with self.lock:
+            return self._pick_zone_candidate(min_zone_spread_count, include_unstable_zone)
+
+    def reserve_zone_candidate(self, source_zone_name, min_zone_spread_count, include_unstable_zone):
+        # Pick and move instance count in one step so concurrent relocation(s) see each other's reservation
+        with self.lock:
+            zone_name = self._pick_zone_candidate(min_zone_spread_count, include_unstable_zone)
+            if zone_name is not None and zone_name != source_zone_name:
+                self._move_instance(source_zone_name, zone_name)
+            return zone_name
+
+    def set_instance_count(self, zone_name, instance_count):
+        with self.lock:
+            if zone_name in self.zone_map:
+                self.zone_map[zone_name].instance_count = instance_count
+                self._refresh(self.zone_map[zone_name])
+
+    def update_zone(self, zone):
+        # Zone not found in cloud cache is not tracked, same as Cloud.update_zone()
+        with self.lock:
+            if zone.name in self.zone_map:
+                self._refresh(self.zone_map[zone.name])
@@ -0,0 +1,63 @@
+import httplib2
+import json
+import threading
+
+# External modules
+from constant import *
+from googleapiclient import discovery
+from googleapiclient.errors import HttpError
+from oauth2client.client import GoogleCredentials
+
+class ClientPool:
+    def __init__(self, credentials, discovery_service_url=discovery.DISCOVERY_URI):
+        self.credentials = credentials
+        self.discovery_document = None
+        self.discovery_service_url = discovery_service_url
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.scoped = False
+
+    def _get_discovery_document(self):
+        # Fetch and parse discovery document once, it is shared read-only by every thread's client
+        with self.lock:
+            if self.discovery_document is None:
+                url = self.discovery_service_url.replace('{api}', API_TYPE).replace('{apiVersion}', API_VERSION)
+                response, content = httplib2.Http().request(url)
+                if response.status >= 400:
+                    raise HttpError(response, content, uri=url)
+                self.discovery_document = json.loads(content)
+            return self.discovery_document
+
+    def _get_http(self):
+        http = httplib2.Http()
+
+        with self.lock:
+            if self.credentials is not None and not self.scoped:
+                # Scope application default credentials once for all clients, same as discovery.build()
+                if isinstance(self.credentials, GoogleCredentials) and self.credentials.create_scoped_required():
+                    scopes = self.discovery_document.get('auth', {}).get('oauth2', {}).get('scopes', {})
+                    self.credentials = self.credentials.create_scoped(list(scopes.keys())) if scopes else None
+                self.scoped = True
+
+        return self.credentials.authorize(http) if self.credentials is not None else http
+
+    def _refresh_credentials(self):
+        # Refresh shared access token centrally instead of letting each client race to refresh it
+        if self.credentials is not None:
+            with self.lock:
+                if self.credentials.access_token is None or self.credentials.access_token_expired:
+                    self.credentials.refresh(httplib2.Http())
+
+    def get_client(self):
+        # httplib2.Http is not thread-safe, hence each thread owns a client with its own keep-alive connection
+        if getattr(self.local, 'client', None) is None:
+            discovery_document = self._get_discovery_document()
+            self.local.http = self._get_http()
+            self.local.client = discovery.build_from_document(discovery_document, http=self.local.http)
+
+        self._refresh_credentials()
+        return self.local.client
+
+    def get_http(self):
+        self.get_client()
+        return self.local.http
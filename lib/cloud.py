@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from pprint import *
 from constant import *
 from instance import *
@@ -5,79 +6,118 @@ from zone import *
 
 class Cloud:
     def __init__(self, instance_list=None):
-        self.zone_list = []
-        if instance_list is None:
-            self.instance_list = []
+        # Instance and zone are indexed by name, zone to instance name index is kept in sync on every change
+        self.instance_map = OrderedDict()
+        self.zone_instance_map = {}
+        self.zone_map = OrderedDict()
+
+        # Sequence of the last journal record already included when this cloud cache is pickled
+        self.journal_sequence = 0
+
+        # Bumped on every change except uptime only drift, readers compare it to skip rebuilding unchanged state
+        self.change_version = 0
+
+        if instance_list is not None:
+            for instance in instance_list:
+                self.add_instance(instance)
+                if not self.has_zone(instance.zone):
+                    self.add_zone(Zone(instance.zone))
+
+    def __setstate__(self, state):
+        # Rebuild indexes when loading cloud cache pickled with instance_list and zone_list
+        if 'instance_list' in state:
+            self.__init__(state['instance_list'])
+            self.zone_map = OrderedDict((zone.name, zone) for zone in state['zone_list'])
         else:
-            self.instance_list = instance_list
-            for instance in self.instance_list:
-                self.add_zone(Zone(instance.zone))
+            self.change_version, self.journal_sequence = 0, 0
+            self.__dict__.update(state)
+
+    def _index_instance(self, instance):
+        self.zone_instance_map.setdefault(instance.zone, set()).add(instance.name)
+
+    def _unindex_instance(self, instance):
+        zone_instance = self.zone_instance_map.get(instance.zone)
+        if zone_instance is not None:
+            zone_instance.discard(instance.name)
+            if len(zone_instance) == 0:
+                del self.zone_instance_map[instance.zone]
 
     def add_instance(self, instance):
-        self.instance_list.append(instance)
+        if instance.name in self.instance_map:
+            self._unindex_instance(self.instance_map[instance.name])
+        self.instance_map[instance.name] = instance
+        self._index_instance(instance)
+        self.change_version += 1
 
     def add_zone(self, zone):
-        self.zone_list.append(zone)
+        self.zone_map[zone.name] = zone
+        self.change_version += 1
 
     def delete_instance(self, instance_name):
-        for instance in self.instance_list:
-            if instance.name == instance_name:
-                self.instance_list.remove(instance)
-                break
+        instance = self.instance_map.pop(instance_name, None)
+        if instance is not None:
+            self._unindex_instance(instance)
+            self.change_version += 1
 
     def delete_zone(self, zone_name):
-        for zone in self.zone_list:
-            if zone.name == zone_name:
-                self.zone_list.remove(zone)
-                break
+        if self.zone_map.pop(zone_name, None) is not None:
+            self.change_version += 1
 
     def get_instance(self, instance_name):
-        for instance in self.instance_list:
-            if instance.name == instance_name:
-                return instance
-        return Instance(instance_name)
+        instance = self.instance_map.get(instance_name)
+        return instance if instance is not None else Instance(instance_name)
+
+    def get_instance_count(self, zone_name=None):
+        if zone_name is None:
+            return len(self.instance_map)
+        else:
+            return len(self.zone_instance_map.get(zone_name, ()))
 
     def get_instance_list(self, zone_name=None):
         if zone_name is None:
-            return self.instance_list
+            return self.instance_map.values()
         else:
-            instance_list = []
-            for instance in self.instance_list:
-                if instance.zone == zone_name:
-                    instance_list.append(instance)
-            return instance_list
+            return [self.instance_map[instance_name] for instance_name in self.zone_instance_map.get(zone_name, ())]
 
     def get_zone(self, zone_name):
-        for zone in self.zone_list:
-            if zone.name == zone_name:
-                return zone
-        return Zone(zone_name)
+        zone = self.zone_map.get(zone_name)
+        return zone if zone is not None else Zone(zone_name)
 
     def get_zone_list(self):
-        return self.zone_list
+        return self.zone_map.values()
 
     def has_instance(self, instance_name):
-        for instance in self.instance_list:
-            if instance.name == instance_name:
-                return True
-        return False
+        return instance_name in self.instance_map
 
     def has_zone(self, zone_name):
-        for zone in self.zone_list:
-            if zone.name == zone_name:
-                return True
-        return False
+        return zone_name in self.zone_map
+
+    def set_changed(self):
+        # For change(s) made in place on cached instance or zone, e.g. zone termination count
+        self.change_version += 1
 
     def update_instance(self, instance):
         current_instance = self.get_instance(instance.name)
+        # Start time and flag are cached as well, uptime accounting alone is not a change
+        if has_changed(current_instance, instance) or (current_instance.start_ts, current_instance.flag) != (instance.start_ts, instance.flag):
+            self.change_version += 1
+
+        # Move instance to its new zone index when zone is changed
+        if self.has_instance(instance.name) and current_instance.zone != instance.zone:
+            self._unindex_instance(current_instance)
+            current_instance.zone = instance.zone
+            self._index_instance(current_instance)
+
         current_instance.creation_ts = instance.creation_ts
         current_instance.ip = instance.ip
         current_instance.machine_type = instance.machine_type
         current_instance.preemptible = instance.preemptible
         current_instance.status = instance.status
         current_instance.zone = instance.zone
+        current_instance.start_ts = instance.start_ts
         current_instance.flag = instance.flag
         current_instance.uptime_hour = instance.uptime_hour
+        current_instance.accounted_ts = instance.accounted_ts
 
     def update_zone(self, zone):
         current_zone = self.get_zone(zone.name)
@@ -85,6 +125,7 @@ class Cloud:
         current_zone.pe_uptime_hour = zone.pe_uptime_hour
         current_zone.npe_uptime_hour = zone.npe_uptime_hour
         current_zone.total_termination_count = zone.total_termination_count
+        current_zone.window = zone.window
 
     def __repr__(self):
         return pformat(vars(self), indent=PRETTY_PRINT_INDENT, width=PRETTY_PRINT_WIDTH)
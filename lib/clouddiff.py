@@ -0,0 +1,45 @@
+from collections import namedtuple
+from constant import *
+from instance import *
+
+InstanceEvent = namedtuple('InstanceEvent', ['event_type', 'instance', 'cached_instance'])
+
+class CloudDiff:
+    def __init__(self, cached_cloud, live_cloud):
+        self.cached_cloud = cached_cloud
+        self.live_cloud = live_cloud
+
+    def get_event_list(self):
+        event_list = []
+
+        # Instance deleted event for cached instance(s) no longer found in live cloud
+        for cached_instance in self.cached_cloud.get_instance_list():
+            if not self.live_cloud.has_instance(cached_instance.name):
+                event_list.append(InstanceEvent(EVENT_DELETED, cached_instance, cached_instance))
+
+        # Single pass over live cloud with hash lookup of each instance previous state
+        for live_instance in self.live_cloud.get_instance_list():
+            if self.cached_cloud.has_instance(live_instance.name):
+                cached_instance = self.cached_cloud.get_instance(live_instance.name)
+            else:
+                cached_instance = Instance(live_instance.name)
+                event_list.append(InstanceEvent(EVENT_CREATED, live_instance, cached_instance))
+
+            event_type = self.get_event_type(cached_instance, live_instance)
+            if event_type is not None:
+                event_list.append(InstanceEvent(event_type, live_instance, cached_instance))
+
+        return event_list
+
+    def get_event_type(self, cached_instance, live_instance):
+        if cached_instance.status != GCE_STATUS_RUNNING and live_instance.status == GCE_STATUS_RUNNING:
+            return EVENT_STARTED
+        elif cached_instance.status == GCE_STATUS_RUNNING and live_instance.status == GCE_STATUS_RUNNING:
+            return EVENT_RUNNING
+        elif cached_instance.status == GCE_STATUS_RUNNING and live_instance.status != GCE_STATUS_RUNNING:
+            return EVENT_TERMINATED
+        elif has_changed(cached_instance, live_instance):
+            return EVENT_UPDATED
+        else:
+            return None
+
@@ -25,6 +25,21 @@ class Config:
         self.INSTANCE_NAME_PREFIX_LIST                  = self.config['GCE_INSTANCE_NAME_PREFIX_LIST'].split(' ')
         self.INSTANCE_TAG_LIST                          = self.config['GCE_INSTANCE_TAG_LIST'].split(' ')
         self.EMAIL_RECIPIENT_LIST                       = self.config['GCE_EMAIL_RECIPIENT_LIST'].split(' ')
+        self.AGGREGATED_LIST_POLLING                    = self.config.get('GCE_AGGREGATED_LIST_POLLING', False)
+        self.API_RATE_LIMIT                             = self.config.get('GCE_API_RATE_LIMIT', API_RATE_LIMIT)
+        self.API_BURST_LIMIT                            = self.config.get('GCE_API_BURST_LIMIT', API_BURST_LIMIT)
+        self.NUMPY_ZONE_SCORING                         = self.config.get('GCE_NUMPY_ZONE_SCORING', False)
+        self.TERMINATION_RATE_WINDOW                    = self.config.get('GCE_TERMINATION_RATE_WINDOW', RATE_WINDOW_LIFETIME)
+        self.STATE_BACKEND                              = self.config.get('GCE_STATE_BACKEND', STATE_BACKEND_JOURNAL)
+        self.UPTIME_REFRESH_INTERVAL                    = self.config.get('GCE_UPTIME_REFRESH_INTERVAL', UPTIME_REFRESH_SECOND)
+        self.EVENT_WORKER_COUNT                         = self.config.get('GCE_EVENT_WORKER_COUNT', EVENT_WORKER_COUNT)
+        self.RECOVERY_WORKER_COUNT                      = self.config.get('GCE_RECOVERY_WORKER_COUNT', RECOVERY_WORKER_COUNT)
+
+        # Checked here since API call(s) are made before GCE_Manager.validate_rules(), invalid limit would block every call
+        if self.API_RATE_LIMIT <= 0:
+            raise ValueError(ERR_INVALID_API_RATE_LIMIT)
+        elif self.API_BURST_LIMIT < 1:
+            raise ValueError(ERR_INVALID_API_BURST_LIMIT)
 
         os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = self.GOOGLE_APPLICATION_CREDENTIALS
         self.credentials = GoogleCredentials.get_application_default()
@@ -22,9 +22,28 @@ GCE_PRICING_TABLE['n1-highcpu-32']  = (0.928, 0.320)
 API_FAILURE_MESSAGE     = '%s() failed: %s'
 API_MAX_RETRY_NESSAGE   = '%s() max. retry exceeded after %s call(s). Reason: %s'
 API_RETRY_MESSAGE       = '%s() failed: %s. Retrying...'
+API_MAX_BATCH_SIZE      = 1000
+API_INSTANCE_FIELD_MASK = 'name,creationTimestamp,lastStartTimestamp,networkInterfaces/networkIP,machineType,scheduling/preemptible,status,zone'
+API_INSTANCE_FIELDS     = 'items(%s),nextPageToken' % API_INSTANCE_FIELD_MASK
+API_AGGREGATED_FIELDS   = 'items/*/instances(%s),nextPageToken' % API_INSTANCE_FIELD_MASK
 API_POLLING_INTERVAL    = 2
+API_PRIORITY_MUTATION   = 0
+API_PRIORITY_OPERATION  = 1
+API_PRIORITY_POLLING    = 2
+API_RATE_LIMIT          = 20
+API_BURST_LIMIT         = 20
+API_RETRY_BASE_DELAY    = 1
+API_RETRY_MAX_DELAY     = 32
+API_RETRY_DEADLINE      = 60
 API_TYPE                = 'compute'
 API_VERSION             = 'v1'
+EVENT_QUEUE_NAME        = 'event'
+EVENT_QUEUE_SIZE        = 10000
+EVENT_WORKER_COUNT      = 4
+RECOVERY_QUEUE_NAME     = 'recovery'
+RECOVERY_WORKER_COUNT   = 16
+
+API_PRIORITY_NAME       = {API_PRIORITY_MUTATION: 'mutation', API_PRIORITY_OPERATION: 'operation', API_PRIORITY_POLLING: 'polling'}
 
 GCE_PREEMPTIBLE         = 'PE'
 GCE_NON_PREEMPTIBLE     = 'NPE'
@@ -35,6 +54,13 @@ GCE_STATUS_RUNNING      = 'RUNNING'
 GCE_STATUS_STOPPING     = 'STOPPING'
 GCE_STATUS_TERMINATED   = 'TERMINATED'
 
+EVENT_CREATED           = 'CREATED'
+EVENT_DELETED           = 'DELETED'
+EVENT_RUNNING           = 'RUNNING'
+EVENT_STARTED           = 'STARTED'
+EVENT_TERMINATED        = 'TERMINATED'
+EVENT_UPDATED           = 'UPDATED'
+
 INSTANCE_FLAG_NEW       = 'NEW'
 INSTANCE_FLAG_MATURED   = 'MATURED'
 INSTANCE_FLAG_RECYCLED  = 'RECYCLED'
@@ -49,15 +75,33 @@ PE_AVAILABLE_ZONE_ONLY  = False
 PREEMPTIBLE             = True
 NON_PREEMPTIBLE         = False
 
+RATE_WINDOW_EWMA        = 'ewma'
+RATE_WINDOW_LIFETIME    = 'lifetime'
+RATE_WINDOW_SECOND      = {'1h': 3600, '6h': 21600, '24h': 86400}
+RATE_WINDOW_LIST        = [RATE_WINDOW_LIFETIME, RATE_WINDOW_EWMA] + sorted(RATE_WINDOW_SECOND)
+
 INSTANCE_MATURITY_HOUR  = 23
 LOGGER_MAX_LINE_BUFFER  = 500
 MAX_API_RETRY_COUNT     = 2
+MAX_POLL_WORKER_COUNT   = 16
+MUTATION_BATCH_WINDOW   = 0.2
+OPERATION_POLL_INTERVAL = 1
+OPERATION_RECOVER       = 'recover'
+OPERATION_STOP          = 'stop'
+OPERATION_INTENT_LIST   = [OPERATION_RECOVER, OPERATION_STOP]
+STATUS_WAIT_TIMEOUT     = 60
+STATUS_WAIT_MAX_SECOND  = 1800
+PLACEMENT_COMPACT_RATIO = 4
 PRETTY_PRINT_INDENT     = 4
 PRETTY_PRINT_WIDTH      = 80
 HOUR_PER_SECOND         = (float(1) / 3600)
 REPORT_LOG_COUNT        = 10
 UPTIME_DECIMAL          = 5
 
+EWMA_HALF_LIFE_SECOND   = 21600
+WINDOW_BUCKET_COUNT     = 288
+WINDOW_BUCKET_SECOND    = 300
+
 CURRENT_PROCESS         = '/proc/self'
 DEFAULT_EMAIL_FOOTER    = 'For more details, go to https://github.com/binary-com/gce-manager'
 DEFAULT_EMAIL_SUBJECT   = 'Report of GCE instance changes'
@@ -77,13 +121,52 @@ MESSAGE_CONVERT_NPE     = 'Converting %s:%s@%s to non-preemptible instance after
 MESSAGE_RECYCLE         = 'Recycling %s:%s@%s after %s hour(s)'
 MESSAGE_RELOCATE        = 'Relocating %s:%s@%s to a different zone after %s hour(s)'
 MESSAGE_PE_HIGH_DEMAND  = 'Exceeded threshold of total zone(s) with high demand in preemptible instance'
+MESSAGE_SKIP_RECOVERY   = 'Recovery of %s:%s@%s skipped, instance status is %s'
 MESSAGE_SAME_ZONE       = 'Destination zone candidate for relocation is same as current zone'
 
+METRIC_API_THROTTLED_COUNT  = 'API call(s) throttled (%s)'
+METRIC_API_THROTTLED_TIME   = 'API throttled time in second(s) (%s)'
+METRIC_API_RETRY_COUNT      = 'API retries (%s)'
+METRIC_API_RETRY_DELAY      = 'API retry delay in second(s) (%s)'
+METRIC_API_FAILURE_COUNT    = 'API call(s) failed (%s)'
+METRIC_MUTATION_BATCH       = 'Mutation batch request(s)'
+METRIC_MUTATION_BATCHED     = 'Mutation(s) sent in batch'
+METRIC_OPERATION_BATCH      = 'Operation polling batch request(s)'
+METRIC_OPERATION_PENDING    = 'Operation(s) pending'
+METRIC_OPERATION_IN_FLIGHT  = 'Instance operation(s) in flight (%s)'
+METRIC_OPERATION_COALESCED  = 'Instance operation(s) coalesced'
+METRIC_OPERATION_SUPERSEDED = 'Instance operation(s) superseded'
+METRIC_STATUS_WAITER        = 'Instance status waiter(s)'
+METRIC_EVENT_QUEUED         = 'Event(s) queued (%s)'
+METRIC_EVENT_HANDLED        = 'Event(s) handled (%s)'
+METRIC_EVENT_WAIT_AVG       = 'Event queue avg. wait in second(s) (%s)'
+METRIC_EVENT_WAIT_MAX       = 'Event queue max. wait in second(s) (%s)'
+METRIC_EVENT_LATENCY_AVG    = 'Event handler avg. latency in second(s) (%s)'
+METRIC_EVENT_LATENCY_MAX    = 'Event handler max. latency in second(s) (%s)'
+METRIC_ZONE_CHANGED         = 'Zone poll(s) with instance change'
+METRIC_ZONE_UNCHANGED       = 'Zone poll(s) without instance change'
+METRIC_ZONE_CHANGED_RATIO   = 'Zone poll(s) with instance change ratio'
+
 LOG_RECORD_FORMAT       = '[%(asctime)s] %(levelname)s - %(message)s'
 LOG_TIMESTAMP_FORMAT    = '%Y-%m-%d %H:%M:%S'
+JOURNAL_COMPACT_COUNT   = 10000
+JOURNAL_COMPACT_SECOND  = 300
+JOURNAL_FILE_EXTENSION  = '.journal'
+JOURNAL_DELETE_INSTANCE = 'delete_instance'
+JOURNAL_TERMINATION     = 'termination'
+JOURNAL_UPDATE_INSTANCE = 'update_instance'
 PICKLE_FILE_EXTENSION   = '.pkl'
 PICKLE_FILE_PATH_FORMAT = '%s/.%s%s'
-
+SQLITE_CHECKPOINT_KEY   = 'checkpoint_termination_event_id'
+SQLITE_FILE_PATH_FORMAT = '%s/.%s.db'
+STATE_BACKEND_JOURNAL   = 'journal'
+STATE_BACKEND_SQLITE    = 'sqlite'
+STATE_BACKEND_LIST      = [STATE_BACKEND_JOURNAL, STATE_BACKEND_SQLITE]
+STATE_CHECKPOINT_SECOND = 300
+UPTIME_REFRESH_SECOND   = 60
+
+MUTATION_ABORT_MESSAGE  = 'Mutation aborted due to shutdown'
+NUMPY_MISSING_MESSAGE   = 'NumPy is not installed, GCE_NUMPY_ZONE_SCORING is ignored'
 REPORT_TEMPLATE         = '%s##Estimated Cost/Savings#%s##Zone(s) Configured#%s##Instance List#%s##GCE Manager Configuration#%s##%s'.replace('#', HTML_LINE_BREAK_TAG)
 SHUTDOWN_MESSAGE        = 'Received SIGHUP signal for graceful shutdown. Exiting...'
 STARTUP_MESSAGE         = 'Instance monitoring started for project \'%s\''
@@ -93,20 +176,28 @@ SLACKBOT_CMD_HELP       = 'help'
 SLACKBOT_CMD_CONFIG     = 'show config'
 SLACKBOT_CMD_LI         = 'show instance list'
 SLACKBOT_CMD_LZ         = 'show zone list'
+SLACKBOT_CMD_METRIC     = 'show metrics'
 SLACKBOT_CMD_SAVINGS    = 'show savings'
 
 SLACKBOT_EMOJI          = ':snowman:'
 SLACKBOT_ERR_CONNECT    = 'Connection to Slack failed, invalid token?'
 SLACKBOT_MSG_ACK        = '@%s Here\'s the information that you\'ve requested\n'
 SLACKBOT_MSG_COST_NOTE  = 'Note: Savings are calculated based on total of (PE-hour x NPE-cost/hour) - (PE-hour x PE-cost/hour)'
-SLACKBOT_MSG_HELP       = '```Commands available:\n1. show config\n2. show instance list\n3. show savings\n4. show zone list\n5. help\n\n%s```' % DEFAULT_EMAIL_FOOTER
+SLACKBOT_MSG_HELP       = '```Commands available:\n1. show config\n2. show instance list\n3. show metrics\n4. show savings\n5. show zone list\n6. help\n\n%s```' % DEFAULT_EMAIL_FOOTER
 SLACKBOT_MSG_UNAUTH     = 'Nice try @%s but I\'m not authorized to serve your request :hand:'
 SLACKBOT_MSG_UNKNOWN    = 'I\'m sorry @%s. I don\'t understand your request. Type @%s help to see available commands'
 SLACKBOT_USERNAME       = 'gcebot'
 
 TABLE_TITLE_COST        = ['Usage Type', 'Usage Hour', 'Cost/Hour', 'Total', 'Savings']
+TABLE_TITLE_METRIC      = ['Metric', 'Value']
 TABLE_TITLE_INSTANCE    = ['Node', 'Zone', 'Private IP', 'Type', 'Uptime Hour', 'Flag', 'Status']
 TABLE_TITLE_ZONE        = ['Zone', 'Instance', 'Uptime Hour', 'Termination', 'Termination Rate']
 
 ERR_INSTANCE_LESSER_THAN_ZONE_SPREAD    = 'Minimum instance count must be greater or equal to the minimum number of zone(s) to be spread evenly'
 ERR_ZONES_LESSER_THAN_ZONE_SPREAD       = 'Minimum zone count must be greater or equal to the minimum number of zone(s) to be spread evenly'
+ERR_INVALID_RATE_WINDOW                 = 'Termination rate window must be one of: %s' % ', '.join(RATE_WINDOW_LIST)
+ERR_INVALID_STATE_BACKEND               = 'State backend must be one of: %s' % ', '.join(STATE_BACKEND_LIST)
+ERR_INVALID_UPTIME_REFRESH              = 'Uptime refresh interval must be greater than zero'
+ERR_INVALID_WORKER_COUNT                = 'Event and recovery worker count must be greater than zero'
+ERR_INVALID_API_RATE_LIMIT              = 'API rate limit must be greater than zero'
+ERR_INVALID_API_BURST_LIMIT             = 'API burst limit must be at least 1'
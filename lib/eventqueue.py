@@ -0,0 +1,76 @@
+import Queue
+import threading
+import time
+
+# External modules
+from constant import *
+
+class EventQueue:
+    def __init__(self, name, logger, worker_count, max_size=EVENT_QUEUE_SIZE):
+        # Bounded queue, producer is held back when handler(s) cannot keep up instead of piling up threads
+        self.abort_all = False
+        self.event_queue = Queue.Queue(max_size)
+        self.handled_count = 0
+        self.latency_max = 0.0
+        self.latency_total = 0.0
+        self.lock = threading.Lock()
+        self.log = logger
+        self.name = name
+        self.wait_max = 0.0
+        self.wait_total = 0.0
+        self.worker_list = []
+
+        for index in range(worker_count):
+            worker = threading.Thread(target=self._worker)
+            worker.daemon = True
+            worker.start()
+            self.worker_list.append(worker)
+
+    def _record(self, wait_time, latency):
+        with self.lock:
+            self.handled_count += 1
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_total += latency
+            self.wait_max = max(self.wait_max, wait_time)
+            self.wait_total += wait_time
+
+    def _worker(self):
+        while not self.abort_all:
+            event = self.event_queue.get()
+
+            # Sentinel event is queued by shutdown() to release idle worker
+            if event is None:
+                break
+
+            queued_time, target, args = event
+            start_time = time.time()
+            try:
+                target(*args)
+            except Exception, exception:
+                self.log(API_FAILURE_MESSAGE % (target.__name__, exception))
+            finally:
+                self._record(start_time - queued_time, time.time() - start_time)
+
+    def get_metric_list(self):
+        with self.lock:
+            wait_avg = self.wait_total / self.handled_count if self.handled_count > 0 else 0.0
+            latency_avg = self.latency_total / self.handled_count if self.handled_count > 0 else 0.0
+            return [
+                (METRIC_EVENT_QUEUED % self.name, self.event_queue.qsize()),
+                (METRIC_EVENT_HANDLED % self.name, self.handled_count),
+                (METRIC_EVENT_WAIT_AVG % self.name, round(wait_avg, UPTIME_DECIMAL)),
+                (METRIC_EVENT_WAIT_MAX % self.name, round(self.wait_max, UPTIME_DECIMAL)),
+                (METRIC_EVENT_LATENCY_AVG % self.name, round(latency_avg, UPTIME_DECIMAL)),
+                (METRIC_EVENT_LATENCY_MAX % self.name, round(self.latency_max, UPTIME_DECIMAL))]
+
+    def put(self, target, *args):
+        self.event_queue.put((time.time(), target, args))
+
+    def shutdown(self):
+        self.abort_all = True
+        for worker in self.worker_list:
+            try:
+                self.event_queue.put_nowait(None)
+            except Queue.Full:
+                # Busy worker exits on abort_all after its current event
+                break
@@ -1,22 +1,36 @@
+import re
 import sys
 import threading
-import time
 
 # External modules
+from asyncgapi import *
+from clientpool import *
 from constant import *
 from instance import *
-from googleapiclient import discovery
+from mutationbatcher import *
+from operationtracker import *
+from ratelimiter import *
+from retrypolicy import *
 from util import *
+from workerpool import *
 
 class GAPI:
     def __init__(self, config_obj, slackbot=None):
         self.abort_all = False
+        self.changed_zone_count = 0
         self.config = config_obj
         self.logger = Util('gapi').logger
-        self.all_instance = []
+        self.client_pool = ClientPool(self.config.credentials)
         self.lock = threading.Lock()
+        self.rate_limiter = RateLimiter(self.config.API_RATE_LIMIT, self.config.API_BURST_LIMIT)
+        self.mutation_batcher = MutationBatcher(self.client_pool, self.rate_limiter, self._log)
+        self.operation_tracker = OperationTracker(self.config.PROJECT_ID, self.client_pool, self.rate_limiter, self._log)
+        self.retry_policy = RetryPolicy(self._log)
         self.slackbot = slackbot
-        self.zone_count = len(self.config.ZONE_LIST)
+        self.unchanged_zone_count = 0
+        self.zone_instance_cache = {}
+        self.worker_pool = WorkerPool(min(len(self.config.ZONE_LIST), MAX_POLL_WORKER_COUNT))
+        self.async_engine = AsyncGAPI(self, self._log)
 
     def _dict_to_instance(self, _dict):
         try:
@@ -24,36 +38,84 @@ class GAPI:
             instance = Instance(_dict['name'])
             instance.creation_ts = _dict['creationTimestamp']
             instance.ip = _dict['networkInterfaces'][0]['networkIP'] if has_networkIP else '(None)'
-            instance.machine_type = _dict['machineType'].split('/')[-1]
+            instance.machine_type = intern_string(_dict['machineType'].split('/')[-1])
             instance.preemptible = _dict['scheduling']['preemptible']
-            instance.status = _dict['status']
-            instance.zone = _dict['zone'].split('/')[-1]
+            instance.status = intern_string(_dict['status'])
+            instance.zone = intern_string(_dict['zone'].split('/')[-1])
+            instance.start_ts = get_epoch_time(_dict.get('lastStartTimestamp'))
             return instance
         except Exception, exception:
             self._log(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
 
-    def _get_all_instance_worker(self, zone):
-        locked_acquired = False
+    def _execute(self, priority, request_builder):
+        # Name of the calling API method is used for retry logging and metrics
+        operation_name = sys._getframe(1).f_code.co_name
+
+        def execute_request():
+            # Every API call shares the same project-wide rate limit, including retries
+            request = request_builder(self.client_pool.get_client())
+            self.rate_limiter.acquire(priority)
+            return request.execute()
+
         try:
-            _instance_list = self.list_instance(zone)
-            if _instance_list != None:
-                self.lock.acquire()
-                locked_acquired = True
-                for instance in _instance_list:
-                    if self.abort_all:
-                        break
-                    else:
-                        _instance = self._dict_to_instance(instance)
-                        instance_excluded = _instance.name in self.config.EXCLUDED_INSTANCE_LIST
-
-                        if not instance_excluded and self._match_name_prefix_list(_instance.name):
-                            self.all_instance.append(_instance)
-                self.zone_count -= 1
-                self.lock.release()
-        except Exception, exception:
-            self._log(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
-            if locked_acquired:
-                self.lock.release()
+            return self.retry_policy.execute(operation_name, execute_request)
+        except Exception:
+            # Failure is already logged by retry policy, caller receives None as before
+            return None
+
+    def _get_aggregated_instance(self, zone_list):
+        # Retrieve instance(s) of all zones with a single paginated request then group by configured zone(s)
+        _instance_list = self.aggregated_list_instance()
+        if _instance_list != None:
+            zone_dict_list = dict((zone, []) for zone in zone_list)
+            for instance in _instance_list:
+                zone = instance['zone'].split('/')[-1]
+                if zone in zone_dict_list:
+                    zone_dict_list[zone].append(instance)
+
+            all_instance = []
+            for zone in zone_list:
+                all_instance.extend(self._get_instance_list(zone, zone_dict_list[zone]))
+            return all_instance
+
+    def _get_instance_fingerprint(self, _dict):
+        network_interface_list = _dict.get('networkInterfaces', [])
+        network_ip = network_interface_list[0].get('networkIP') if len(network_interface_list) > 0 else None
+        preemptible = _dict.get('scheduling', {}).get('preemptible')
+        return (_dict.get('name'), _dict.get('status'), preemptible, _dict.get('creationTimestamp'), _dict.get('lastStartTimestamp'), network_ip, _dict.get('machineType'))
+
+    def _get_instance_list(self, zone, dict_list):
+        # Fingerprint raw zone response so unchanged zone reuses Instance objects from previous poll
+        fingerprint = hash(tuple([self._get_instance_fingerprint(_dict) for _dict in dict_list]))
+        previous_fingerprint, previous_instance_list = self.zone_instance_cache.get(zone, (None, None))
+
+        if fingerprint == previous_fingerprint:
+            self._record_zone_change(False)
+            return previous_instance_list
+
+        instance_list = []
+        for instance in dict_list:
+            _instance = self._dict_to_instance(instance)
+            if self._is_managed_instance(_instance):
+                instance_list.append(_instance)
+
+        self.zone_instance_cache[zone] = (fingerprint, instance_list)
+        self._record_zone_change(True)
+        return instance_list
+
+    def _get_name_filter(self):
+        # Server-side filter takes a RE2 regular expression which must match the whole instance name
+        prefix_pattern = '|'.join([re.escape(prefix) for prefix in self.config.INSTANCE_NAME_PREFIX_LIST])
+        return 'name eq \'(%s).*\'' % prefix_pattern
+
+    def _get_zone_instance(self, zone):
+        _instance_list = self.list_instance(zone)
+        if _instance_list != None:
+            return self._get_instance_list(zone, _instance_list)
+
+    def _is_managed_instance(self, instance):
+        instance_excluded = instance.name in self.config.EXCLUDED_INSTANCE_LIST
+        return not instance_excluded and self._match_name_prefix_list(instance.name)
 
     def _log(self, message):
         self.logger.info(message)
@@ -67,166 +129,159 @@ class GAPI:
                 return True
         return False
 
-    def create_disk_from_snapshot(self, zone, disk_name, retry_count=MAX_API_RETRY_COUNT):
-        try:
-            config = {
-                'name': disk_name,
-                'sourceSnapshot': self.config.SNAPSHOT_SOURCE,
-                'type': 'projects/%s/zones/%s/diskTypes/%s' % (self.config.PROJECT_ID, zone, self.config.DISK_TYPE)
-            }
-            compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-            return compute.disks().insert(project=self.config.PROJECT_ID, zone=zone, body=config).execute()
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.create_disk_from_snapshot(zone, disk_name, (retry_count - 1))
+    def _record_zone_change(self, changed):
+        with self.lock:
+            if changed:
+                self.changed_zone_count += 1
             else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+                self.unchanged_zone_count += 1
 
-    def create_instance(self, zone, instance_name, disk_name, preemptible, retry_count=MAX_API_RETRY_COUNT):
+    def _wait(self, future):
+        # Sync mutation API blocks on async engine future. Failure is already logged by retry policy and caller receives None as before
         try:
-            config = {
-                'name': instance_name,
-                'machineType': 'projects/%s/zones/%s/machineTypes/%s' % (self.config.PROJECT_ID, zone, self.config.MACHINE_TYPE),
-                'tags': {
-                    "items": self.config.INSTANCE_TAG_LIST
-                },
-                'disks': [{
-                    'type': 'PERSISTENT',
-                    'boot': 'true',
-                    'mode': 'READ_WRITE',
-                    'autoDelete': 'true',
-                    'deviceName': disk_name,
-                    'source': 'projects/%s/zones/%s/disks/%s' % (self.config.PROJECT_ID, zone, disk_name)
-                }],
-                'canIpForward': 'false',
-                'networkInterfaces': [{
-                    'network': 'projects/%s/global/networks/default' % self.config.PROJECT_ID
-                }],
-                'scheduling': {
-                    'preemptible': str(preemptible).lower(),
-                    'onHostMaintenance': 'TERMINATE' if preemptible else 'MIGRATE',
-                    'automaticRestart': 'false' if preemptible else 'true'
-                },
-                "metadata": {
-                    "items": [{
-                        "key": "name",
-                        "value": instance_name
-                    }]
-                },
-                'serviceAccounts': [{
-                    'email': 'default',
-                    'scopes': [
-                        'https://www.googleapis.com/auth/devstorage.read_only',
-                        'https://www.googleapis.com/auth/logging.write',
-                        'https://www.googleapis.com/auth/monitoring.write',
-                        'https://www.googleapis.com/auth/cloud.useraccounts.readonly'
-                    ]
-                }]
-            }
+            return future.result()
+        except Exception:
+            return None
 
-            compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-            return compute.instances().insert(project=self.config.PROJECT_ID, zone=zone, body=config).execute()
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.create_instance(zone, instance_name, disk_name, preemptible, (retry_count - 1))
-            else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+    def aggregated_list_instance(self):
+        instance_list, page_token = [], None
+
+        while True:
+            # Request only fields used by _dict_to_instance() for instance(s) matching name prefix
+            response = self._execute(API_PRIORITY_POLLING, lambda compute: compute.instances().aggregatedList(
+                project=self.config.PROJECT_ID, filter=self._get_name_filter(), pageToken=page_token,
+                fields=API_AGGREGATED_FIELDS))
+            if response == None:
+                return None
+
+            for scope, scoped_list in response.get('items', {}).items():
+                instance_list.extend(scoped_list.get('instances', []))
+
+            page_token = response.get('nextPageToken')
+            if page_token == None:
+                return instance_list
+
+    def create_disk_from_snapshot(self, zone, disk_name):
+        return self._wait(self.async_engine.create_disk_from_snapshot(zone, disk_name))
+
+    def create_instance(self, zone, instance_name, disk_name, preemptible):
+        return self._wait(self.async_engine.create_instance(zone, instance_name, disk_name, preemptible))
 
     def create_instance_from_snapshot(self, zone, instance_name, preemptible):
-        try:
-            try:
-                response = self.create_disk_from_snapshot(zone, instance_name)
-                self.wait_for_operation(zone, response)
-            except:
-                self._log(API_FAILURE_MESSAGE % ('create_disk_from_snapshot', 'Skipped'))
-            finally:
-                return self.create_instance(zone, instance_name, instance_name, preemptible)
-        except Exception, exception:
-            self._log(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
+        return self._wait(self.async_engine.create_instance_from_snapshot(zone, instance_name, preemptible))
 
-    def delete_instance(self, zone, instance_name, retry_count=MAX_API_RETRY_COUNT):
-        try:
-            compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-            return compute.instances().delete(project=self.config.PROJECT_ID, zone=zone, instance=instance_name).execute()
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.delete_instance(zone, instance_name, (retry_count - 1))
-            else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+    def delete_instance(self, zone, instance_name):
+        return self._wait(self.async_engine.delete_instance(zone, instance_name))
 
     def get_all_instance(self, zone_list):
         try:
-            # Use a separate thread in getting instance list for each zone
-            self.all_instance, self.zone_count = [], len(zone_list)
-            for zone in zone_list:
-                if self.abort_all:
-                    break
-                else:
-                    threading.Thread(target=self._get_all_instance_worker, args=(zone,)).start()
-
-            # Check for completion of instance(s) retrieval every 100ms
-            while self.zone_count > 0 and not self.abort_all:
-                time.sleep(0.1)
-            return self.all_instance
+            if self.config.AGGREGATED_LIST_POLLING:
+                return self._get_aggregated_instance(zone_list)
+
+            # Retrieve instance list of each zone concurrently from worker pool, result is collected per poll
+            future_list = [self.worker_pool.submit(self._get_zone_instance, zone) for zone in zone_list]
+            all_instance = []
+
+            # Block until every zone is retrieved, discard this poll if any zone failed
+            for future in future_list:
+                zone_instance = future.result()
+                if zone_instance == None:
+                    return None
+                all_instance.extend(zone_instance)
+            return all_instance
         except Exception, exception:
             self._log(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
 
-    def list_instance(self, zone, retry_count=MAX_API_RETRY_COUNT):
-        try:
-            compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-            instances = compute.instances().list(project=self.config.PROJECT_ID, zone=zone).execute()
-            if 'items' in instances:
-                return instances['items']
-            else:
-                return []
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.list_instance(zone, (retry_count - 1))
-            else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+    def get_disk_config(self, zone, disk_name):
+        return {
+            'name': disk_name,
+            'sourceSnapshot': self.config.SNAPSHOT_SOURCE,
+            'type': 'projects/%s/zones/%s/diskTypes/%s' % (self.config.PROJECT_ID, zone, self.config.DISK_TYPE)
+        }
+
+    def get_instance_config(self, zone, instance_name, disk_name, preemptible):
+        return {
+            'name': instance_name,
+            'machineType': 'projects/%s/zones/%s/machineTypes/%s' % (self.config.PROJECT_ID, zone, self.config.MACHINE_TYPE),
+            'tags': {
+                "items": self.config.INSTANCE_TAG_LIST
+            },
+            'disks': [{
+                'type': 'PERSISTENT',
+                'boot': 'true',
+                'mode': 'READ_WRITE',
+                'autoDelete': 'true',
+                'deviceName': disk_name,
+                'source': 'projects/%s/zones/%s/disks/%s' % (self.config.PROJECT_ID, zone, disk_name)
+            }],
+            'canIpForward': 'false',
+            'networkInterfaces': [{
+                'network': 'projects/%s/global/networks/default' % self.config.PROJECT_ID
+            }],
+            'scheduling': {
+                'preemptible': str(preemptible).lower(),
+                'onHostMaintenance': 'TERMINATE' if preemptible else 'MIGRATE',
+                'automaticRestart': 'false' if preemptible else 'true'
+            },
+            "metadata": {
+                "items": [{
+                    "key": "name",
+                    "value": instance_name
+                }]
+            },
+            'serviceAccounts': [{
+                'email': 'default',
+                'scopes': [
+                    'https://www.googleapis.com/auth/devstorage.read_only',
+                    'https://www.googleapis.com/auth/logging.write',
+                    'https://www.googleapis.com/auth/monitoring.write',
+                    'https://www.googleapis.com/auth/cloud.useraccounts.readonly'
+                ]
+            }]
+        }
+
+    def get_metric_list(self):
+        with self.lock:
+            total_zone_count = self.changed_zone_count + self.unchanged_zone_count
+            changed_zone_ratio = round(float(self.changed_zone_count) / total_zone_count, UPTIME_DECIMAL) if total_zone_count > 0 else 0.0
+            zone_metric_list = [
+                (METRIC_ZONE_CHANGED, self.changed_zone_count),
+                (METRIC_ZONE_UNCHANGED, self.unchanged_zone_count),
+                (METRIC_ZONE_CHANGED_RATIO, changed_zone_ratio)]
+
+        return zone_metric_list + self.mutation_batcher.get_metric_list() + self.operation_tracker.get_metric_list() + self.rate_limiter.get_metric_list() + self.retry_policy.get_metric_list()
+
+    def list_instance(self, zone):
+        instance_list, page_token = [], None
+
+        while True:
+            # Request only fields used by _dict_to_instance() for instance(s) matching name prefix
+            response = self._execute(API_PRIORITY_POLLING, lambda compute: compute.instances().list(
+                project=self.config.PROJECT_ID, zone=zone, filter=self._get_name_filter(), pageToken=page_token,
+                fields=API_INSTANCE_FIELDS))
+            if response == None:
+                return None
+
+            instance_list.extend(response.get('items', []))
+
+            page_token = response.get('nextPageToken')
+            if page_token == None:
+                return instance_list
 
     def shutdown(self):
         self.abort_all = True
+        self.mutation_batcher.shutdown()
+        self.operation_tracker.shutdown()
+        self.retry_policy.shutdown()
+        self.worker_pool.shutdown()
 
-    def start_instance(self, zone, instance_name, retry_count=MAX_API_RETRY_COUNT):
-        try:
-            compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-            return compute.instances().start(project=self.config.PROJECT_ID, zone=zone, instance=instance_name).execute()
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.start_instance(zone, instance_name, (retry_count - 1))
-            else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+    def start_instance(self, zone, instance_name):
+        return self._wait(self.async_engine.start_instance(zone, instance_name))
 
-    def stop_instance(self, zone, instance_name, retry_count=MAX_API_RETRY_COUNT):
-        try:
-            compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-            return compute.instances().stop(project=self.config.PROJECT_ID, zone=zone, instance=instance_name).execute()
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.stop_instance(zone, instance_name, (retry_count - 1))
-            else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+    def stop_instance(self, zone, instance_name):
+        return self._wait(self.async_engine.stop_instance(zone, instance_name))
 
-    def wait_for_operation(self, zone, op_response, retry_count=MAX_API_RETRY_COUNT):
-        try:
-            while True and op_response is not None:
-                compute = discovery.build(API_TYPE, API_VERSION, credentials=self.config.credentials)
-                result = compute.zoneOperations().get(project=self.config.PROJECT_ID, zone=zone, operation=op_response['name']).execute()
-
-                if result['status'] == 'DONE' or self.abort_all:
-                    return result['status']
-                else:
-                    time.sleep(1)
-        except Exception, exception:
-            if retry_count > 0 and not self.abort_all:
-                self._log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
-                return self.wait_for_operation(zone, op_response, (retry_count - 1))
-            else:
-                self._log(API_MAX_RETRY_NESSAGE % (sys._getframe().f_code.co_name, MAX_API_RETRY_COUNT, exception))
+    def wait_for_operation(self, zone, op_response):
+        # Block until operation tracker observes the operation is done
+        if op_response is not None:
+            return self.operation_tracker.register(zone, op_response).result()
@@ -1,7 +1,38 @@
+import calendar
+from datetime import datetime
+from operator import attrgetter
 from pprint import *
 from constant import *
 
-class Instance:
+try:
+    intern
+except NameError:
+    # Allow memory benchmark to run under Python 3 where tracemalloc is available
+    from sys import intern
+
+def intern_string(value):
+    # Share a single copy of repeated status, flag, machine type and zone strings among all instances
+    return intern(str(value)) if value is not None else None
+
+def get_epoch_time(timestamp):
+    # RFC 3339 timestamp returned by GCE API e.g. '2016-08-01T00:00:00.000-07:00', fraction of second is ignored
+    if timestamp is None:
+        return None
+
+    utc_offset = 0
+    if timestamp[-6] in '+-':
+        utc_offset = (int(timestamp[-5:-3]) * 60 + int(timestamp[-2:])) * 60 * (-1 if timestamp[-6] == '-' else 1)
+    return calendar.timegm(datetime.strptime(timestamp[:19], '%Y-%m-%dT%H:%M:%S').timetuple()) - utc_offset
+
+# Attribute(s) reported by GCE API, compared as one tuple instead of field by field
+get_instance_state = attrgetter('status', 'zone', 'ip', 'creation_ts', 'machine_type', 'preemptible')
+
+def has_changed(instance, other_instance):
+    return get_instance_state(instance) != get_instance_state(other_instance)
+
+class Instance(object):
+    __slots__ = ('name', 'creation_ts', 'ip', 'machine_type', 'preemptible', 'status', 'zone', 'start_ts', 'flag', 'uptime_hour', 'accounted_ts')
+
     def __init__(self, name=None):
         self.name = name
         self.creation_ts = None
@@ -10,9 +41,27 @@ class Instance:
         self.preemptible = None
         self.status = None
         self.zone = None
+        self.start_ts = None
 
+        # Uptime is accounted up to accounted_ts, the epoch time instance was last seen running
         self.flag = INSTANCE_FLAG_NEW
         self.uptime_hour = 0
+        self.accounted_ts = None
+
+    def __getstate__(self):
+        return dict((attribute, getattr(self, attribute)) for attribute in self.__slots__)
+
+    def __setstate__(self, state):
+        # State pickled from dict-backed Instance is accepted as well, missing attribute keeps its default value
+        self.__init__(state.get('name'))
+        for attribute in self.__slots__:
+            if attribute in state:
+                setattr(self, attribute, state[attribute])
+
+        self.flag = intern_string(self.flag)
+        self.machine_type = intern_string(self.machine_type)
+        self.status = intern_string(self.status)
+        self.zone = intern_string(self.zone)
 
     def __repr__(self):
-        return pformat(vars(self), indent=PRETTY_PRINT_INDENT, width=PRETTY_PRINT_WIDTH)
+        return pformat(self.__getstate__(), indent=PRETTY_PRINT_INDENT, width=PRETTY_PRINT_WIDTH)
@@ -0,0 +1,113 @@
+import os
+import pickle
+import sys
+import time
+
+# External modules
+from cloud import *
+from constant import *
+
+class Journal:
+    def __init__(self, name, util):
+        # Cloud cache is kept as the last compacted pickle plus an append-only journal of changes made since
+        self.compact_ts = time.time()
+        self.journal_file = PICKLE_FILE_PATH_FORMAT % (util.get_current_user_home(), name, JOURNAL_FILE_EXTENSION)
+        self.name = name
+        self.output = None
+        self.pending_record_count = 0
+        self.record_count = 0
+        self.sequence = 0
+        self.util = util
+
+    def _append(self, record_type, *args):
+        self.sequence += 1
+        pickle.dump((self.sequence, record_type) + args, self.output, pickle.HIGHEST_PROTOCOL)
+        self.pending_record_count += 1
+        self.record_count += 1
+
+    def _apply(self, cloud, record_type, args):
+        if record_type == JOURNAL_UPDATE_INSTANCE:
+            instance = Instance()
+            instance.__setstate__(args[0])
+            cloud.add_instance(instance)
+        elif record_type == JOURNAL_DELETE_INSTANCE:
+            cloud.delete_instance(args[0])
+        elif record_type == JOURNAL_TERMINATION and cloud.has_zone(args[0]):
+            zone = cloud.get_zone(args[0])
+            zone.total_termination_count += 1
+            zone.window.add_termination(args[1])
+
+    def _read(self):
+        cloud = self.util.load_object(self.name)
+        cloud = Cloud() if cloud == None else cloud
+        return cloud, self._replay(cloud)
+
+    def _replay(self, cloud):
+        # Size of the valid record(s) is returned, journal file is only read here
+        if not os.path.isfile(self.journal_file):
+            return 0
+
+        with open(self.journal_file, 'rb') as input:
+            valid_size = 0
+            while True:
+                try:
+                    record = pickle.load(input)
+                except Exception:
+                    break
+
+                sequence, record_type, args = record[0], record[1], record[2:]
+                if sequence > cloud.journal_sequence:
+                    self._apply(cloud, record_type, args)
+                    self.record_count += 1
+                self.sequence = max(self.sequence, sequence)
+                valid_size = input.tell()
+            return valid_size
+
+    def add_termination(self, zone_name, timestamp):
+        self._append(JOURNAL_TERMINATION, zone_name, timestamp)
+
+    def close(self):
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+    def compact(self, cloud):
+        # Journal is emptied only after the pickle holding every journaled change is renamed into place
+        cloud.journal_sequence = self.sequence
+        if self.util.save_object(self.name, cloud):
+            self.output.close()
+            self.output = open(self.journal_file, 'wb')
+            self.compact_ts = time.time()
+            self.record_count = 0
+
+    def delete_instance(self, instance_name):
+        self._append(JOURNAL_DELETE_INSTANCE, instance_name)
+
+    def flush(self, cloud):
+        try:
+            # Records of a whole tick share a single fsync
+            if self.pending_record_count > 0:
+                self.output.flush()
+                os.fsync(self.output.fileno())
+                self.pending_record_count = 0
+
+            compact_due = (time.time() - self.compact_ts) > JOURNAL_COMPACT_SECOND
+            if self.record_count >= JOURNAL_COMPACT_COUNT or (compact_due and self.record_count > 0):
+                self.compact(cloud)
+        except Exception, exception:
+            self.util.logger.info(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
+
+    def load(self):
+        cloud, valid_size = self._read()
+
+        # Record partially written before a crash is discarded along with anything after it
+        self.output = open(self.journal_file, 'ab')
+        self.output.truncate(valid_size)
+        return cloud
+
+    def read(self):
+        # Read-only load, e.g. for migration to another state backend
+        return self._read()[0]
+
+    def update_instance(self, instance):
+        self._append(JOURNAL_UPDATE_INSTANCE, instance.__getstate__())
@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+
+# External modules
+from constant import *
+from workerpool import *
+
+class MutationBatcher:
+    def __init__(self, client_pool, rate_limiter, logger):
+        self.abort_all = False
+        self.batch_count = 0
+        self.client_pool = client_pool
+        self.condition = threading.Condition()
+        self.log = logger
+        self.mutation_count = 0
+        self.pending_mutation = []
+        self.rate_limiter = rate_limiter
+
+        worker = threading.Thread(target=self._flush_mutation)
+        worker.daemon = True
+        worker.start()
+
+    def _flush_mutation(self):
+        while not self.abort_all:
+            with self.condition:
+                while len(self.pending_mutation) == 0 and not self.abort_all:
+                    self.condition.wait()
+
+            # Collect mutation(s) arriving within batch window unless batch is already full
+            window_end_time = time.time() + MUTATION_BATCH_WINDOW
+            with self.condition:
+                while len(self.pending_mutation) < API_MAX_BATCH_SIZE and time.time() < window_end_time and not self.abort_all:
+                    self.condition.wait(window_end_time - time.time())
+                pending_mutation = self.pending_mutation[:API_MAX_BATCH_SIZE]
+                del self.pending_mutation[:API_MAX_BATCH_SIZE]
+
+            if len(pending_mutation) > 0:
+                self._send_batch(pending_mutation)
+
+    def _send_batch(self, pending_mutation):
+        future_map = {}
+
+        def on_mutation_response(request_id, response, exception):
+            if exception is not None:
+                future_map[request_id].set_exception(exception)
+            else:
+                future_map[request_id].set_result(response)
+
+        try:
+            # Request(s) are built on caller threads, batch is sent with this thread's own connection
+            compute = self.client_pool.get_client()
+            batch = compute.new_batch_http_request(callback=on_mutation_response)
+            for index, (request, future) in enumerate(pending_mutation):
+                future_map[str(index)] = future
+                batch.add(request, request_id=str(index))
+
+            self.rate_limiter.acquire(API_PRIORITY_MUTATION, len(pending_mutation))
+            batch.execute(http=self.client_pool.get_http())
+            self.batch_count += 1
+            self.mutation_count += len(pending_mutation)
+        except Exception, exception:
+            # Fail every unanswered mutation so callers can apply their own retry policy
+            self.log(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
+            for request, future in pending_mutation:
+                if not future.done():
+                    future.set_exception(exception)
+
+    def get_metric_list(self):
+        return [(METRIC_MUTATION_BATCH, self.batch_count), (METRIC_MUTATION_BATCHED, self.mutation_count)]
+
+    def shutdown(self):
+        with self.condition:
+            self.abort_all = True
+            for request, future in self.pending_mutation:
+                future.set_exception(Exception(MUTATION_ABORT_MESSAGE))
+            self.pending_mutation = []
+            self.condition.notify_all()
+
+    def submit(self, request):
+        future = Future()
+        with self.condition:
+            if self.abort_all:
+                future.set_exception(Exception(MUTATION_ABORT_MESSAGE))
+            else:
+                self.pending_mutation.append((request, future))
+                self.condition.notify_all()
+        return future
@@ -0,0 +1,85 @@
+# External modules
+from basezoneaggregate import *
+from constant import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class NumpyZoneAggregate(BaseZoneAggregate):
+    def __init__(self, zone_list, configured_zone_list, termination_rate_threshold, termination_rate_window=RATE_WINDOW_LIFETIME):
+        # Zone metrics are kept column-wise, scoring of all zones is done in one vectorised pass
+        self.zone_index_map = {}
+        self.zone_name_list = []
+
+        self.configured = numpy.zeros(0, dtype=bool)
+        self.instance_count = numpy.zeros(0, dtype=numpy.int64)
+        self.termination_count = numpy.zeros(0, dtype=numpy.float64)
+        self.uptime_hour = numpy.zeros(0, dtype=numpy.float64)
+        self.score = None
+        BaseZoneAggregate.__init__(self, zone_list, configured_zone_list, termination_rate_threshold, termination_rate_window)
+
+    def _get_score(self):
+        # Termination rate and unstable mask are recomputed only after zone metrics changed
+        if self.score is None:
+            termination_rate = numpy.zeros(len(self.zone_name_list), dtype=numpy.float64)
+            numpy.divide(self.termination_count, self.uptime_hour, out=termination_rate, where=self.uptime_hour > 0)
+            self.score = (termination_rate, termination_rate > self.termination_rate_threshold)
+        return self.score
+
+    def _pick_zone_candidate(self, min_zone_spread_count, include_unstable_zone):
+        termination_rate, unstable = self._get_score()
+        eligible = numpy.ones(len(self.zone_name_list), dtype=bool) if include_unstable_zone else ~unstable
+        if not eligible.any():
+            return None
+
+        # Zone(s) with instance count lower than the last unique instance count within minimum zone spread are candidates
+        candidate = eligible.copy()
+        unique_instance_count = numpy.unique(self.instance_count[eligible])
+        if len(unique_instance_count) >= min_zone_spread_count:
+            last_instance_count = unique_instance_count[min_zone_spread_count - 1]
+            candidate &= self.instance_count < last_instance_count
+
+            # Zone with the last unique instance count contributes only its lowest termination rate entry
+            last_zone_index = numpy.flatnonzero(eligible & (self.instance_count == last_instance_count))
+            candidate[last_zone_index[numpy.lexsort((last_zone_index, termination_rate[last_zone_index]))[0]]] = True
+
+        # Rank by termination rate, then instance count, then zone order
+        candidate_index = numpy.flatnonzero(candidate)
+        ranking = numpy.lexsort((candidate_index, self.instance_count[candidate_index], termination_rate[candidate_index]))
+        return self.zone_name_list[candidate_index[ranking[0]]]
+
+    def _refresh(self, zone):
+        if zone.name not in self.zone_index_map:
+            self.zone_index_map[zone.name] = len(self.zone_name_list)
+            self.zone_name_list.append(zone.name)
+            self.configured = numpy.append(self.configured, zone.name in self.configured_zone_set)
+            self.instance_count = numpy.append(self.instance_count, 0)
+            self.termination_count = numpy.append(self.termination_count, 0)
+            self.uptime_hour = numpy.append(self.uptime_hour, 0)
+
+        zone_index = self.zone_index_map[zone.name]
+        termination_count, uptime_hour = zone.get_termination_stat(self.termination_rate_window)
+        self.instance_count[zone_index] = zone.instance_count
+        self.termination_count[zone_index] = termination_count
+        self.uptime_hour[zone_index] = uptime_hour
+        self.score = None
+
+    def get_stable_zone_count(self):
+        with self.lock:
+            return int(numpy.count_nonzero(~self._get_score()[1]))
+
+    def get_termination_rate(self, zone_name):
+        with self.lock:
+            zone_index = self.zone_index_map.get(zone_name)
+            return float(self._get_score()[0][zone_index]) if zone_index is not None else 0.0
+
+    def get_unstable_zone_count(self):
+        with self.lock:
+            return int(numpy.count_nonzero(self._get_score()[1] & self.configured))
+
+    def is_unstable(self, zone_name):
+        with self.lock:
+            zone_index = self.zone_index_map.get(zone_name)
+            return bool(self._get_score()[1][zone_index]) if zone_index is not None else False
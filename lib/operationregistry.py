@@ -0,0 +1,56 @@
+import itertools
+import threading
+
+# External modules
+from constant import *
+
+class OperationRegistry:
+    def __init__(self):
+        # At most one operation is registered per instance, identified by a token issued on registration
+        self.coalesced_count = 0
+        self.lock = threading.Lock()
+        self.operation_map = {}
+        self.sequence = itertools.count(1)
+        self.superseded_count = 0
+
+    def finish(self, instance_name, token):
+        with self.lock:
+            operation = self.operation_map.get(instance_name)
+            if operation is not None and operation[1] == token:
+                del self.operation_map[instance_name]
+
+    def get_metric_list(self):
+        with self.lock:
+            in_flight_count = dict((intent, 0) for intent in OPERATION_INTENT_LIST)
+            for intent, token, started in self.operation_map.values():
+                in_flight_count[intent] += 1
+
+            metric_list = [(METRIC_OPERATION_IN_FLIGHT % intent, in_flight_count[intent]) for intent in OPERATION_INTENT_LIST]
+            return metric_list + [(METRIC_OPERATION_COALESCED, self.coalesced_count), (METRIC_OPERATION_SUPERSEDED, self.superseded_count)]
+
+    def get_operation_list(self):
+        with self.lock:
+            return sorted((instance_name, intent, started) for instance_name, (intent, token, started) in self.operation_map.items())
+
+    def register(self, instance_name, intent):
+        # Same intent already pending or running for the instance is coalesced, a different intent supersedes it
+        with self.lock:
+            operation = self.operation_map.get(instance_name)
+            if operation is not None and operation[0] == intent:
+                self.coalesced_count += 1
+                return None
+
+            token = next(self.sequence)
+            self.operation_map[instance_name] = (intent, token, False)
+            return token
+
+    def start(self, instance_name, token):
+        # Operation superseded while waiting for its turn is dropped
+        with self.lock:
+            operation = self.operation_map.get(instance_name)
+            if operation is None or operation[1] != token:
+                self.superseded_count += 1
+                return False
+
+            self.operation_map[instance_name] = (operation[0], token, True)
+            return True
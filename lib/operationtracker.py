@@ -0,0 +1,95 @@
+import sys
+import threading
+import time
+
+# External modules
+from constant import *
+from workerpool import *
+
+class OperationTracker:
+    def __init__(self, project_id, client_pool, rate_limiter, logger):
+        self.abort_all = False
+        self.batch_count = 0
+        self.client_pool = client_pool
+        self.condition = threading.Condition()
+        self.log = logger
+        self.pending_operation = {}
+        self.project_id = project_id
+        self.rate_limiter = rate_limiter
+
+        worker = threading.Thread(target=self._poll_operation)
+        worker.daemon = True
+        worker.start()
+
+    def _on_operation_response(self, request_id, response, exception):
+        with self.condition:
+            zone, future, failure_count = self.pending_operation.get(request_id, (None, None, 0))
+            if future is None:
+                return
+            elif exception is not None:
+                # Give up on operation only after consecutive failures, transient errors are retried next round
+                if failure_count >= MAX_API_RETRY_COUNT:
+                    self.log(API_MAX_RETRY_NESSAGE % ('wait_for_operation', failure_count + 1, exception))
+                    del self.pending_operation[request_id]
+                    future.set_result(None)
+                else:
+                    self.pending_operation[request_id] = (zone, future, failure_count + 1)
+            elif response['status'] == 'DONE':
+                del self.pending_operation[request_id]
+                future.set_result(response['status'])
+            else:
+                self.pending_operation[request_id] = (zone, future, 0)
+
+    def _poll_operation(self):
+        while not self.abort_all:
+            with self.condition:
+                while len(self.pending_operation) == 0 and not self.abort_all:
+                    self.condition.wait()
+                pending_operation = self.pending_operation.items()
+
+            # Every pending operation is polled each round, one batch request per chunk of API_MAX_BATCH_SIZE
+            for index in range(0, len(pending_operation), API_MAX_BATCH_SIZE):
+                self._poll_operation_batch(pending_operation[index:index + API_MAX_BATCH_SIZE])
+
+            time.sleep(OPERATION_POLL_INTERVAL)
+
+    def _poll_operation_batch(self, pending_operation):
+        try:
+            compute = self.client_pool.get_client()
+            batch = compute.new_batch_http_request(callback=self._on_operation_response)
+            for request_id, (zone, future, failure_count) in pending_operation:
+                operation_name = request_id.split('/')[-1]
+                batch.add(compute.zoneOperations().get(project=self.project_id, zone=zone, operation=operation_name), request_id=request_id)
+
+            self.rate_limiter.acquire(API_PRIORITY_OPERATION, len(pending_operation))
+            batch.execute()
+            self.batch_count += 1
+        except Exception, exception:
+            self.log(API_RETRY_MESSAGE % (sys._getframe().f_code.co_name, exception))
+            for request_id, (zone, future, failure_count) in pending_operation:
+                self._on_operation_response(request_id, None, exception)
+
+    def get_metric_list(self):
+        return [(METRIC_OPERATION_PENDING, len(self.pending_operation)), (METRIC_OPERATION_BATCH, self.batch_count)]
+
+    def register(self, zone, op_response):
+        future = Future()
+        request_id = '%s/%s' % (zone, op_response['name'])
+
+        with self.condition:
+            if request_id in self.pending_operation:
+                return self.pending_operation[request_id][1]
+
+            # Wake poller only when it is idle, otherwise operation is picked up in next polling round
+            if len(self.pending_operation) == 0:
+                self.condition.notify_all()
+            self.pending_operation[request_id] = (zone, future, 0)
+        return future
+
+    def shutdown(self):
+        with self.condition:
+            self.abort_all = True
+            for zone, future, failure_count in self.pending_operation.values():
+                future.set_result(None)
+            self.pending_operation = {}
+            self.condition.notify_all()
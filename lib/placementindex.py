@@ -0,0 +1,52 @@
+import heapq
+
+# External modules
+from constant import *
+
+class PlacementIndex:
+    def __init__(self):
+        # Heap entry is (instance_count, termination_rate, zone_order, zone_name), outdated entries are skipped lazily
+        self.entry_map = {}
+        self.heap = []
+        self.zone_order = {}
+
+    def _compact(self):
+        self.heap = self.entry_map.values()
+        heapq.heapify(self.heap)
+
+    def _is_current(self, entry):
+        return self.entry_map.get(entry[-1]) is entry
+
+    def pick(self, min_zone_spread_count, is_excluded):
+        popped_entry_list, unique_instance_count_set, candidate = [], set(), None
+
+        # Pop zone(s) by instance count up to the number of minimum zone spread, pick the lowest termination rate
+        while len(self.heap) > 0 and len(unique_instance_count_set) < min_zone_spread_count:
+            entry = heapq.heappop(self.heap)
+            if not self._is_current(entry):
+                continue
+
+            popped_entry_list.append(entry)
+            instance_count, termination_rate, zone_order, zone_name = entry
+            if not is_excluded(zone_name):
+                unique_instance_count_set.add(instance_count)
+                # Entries are popped by instance count, hence same termination rate keeps the lower instance count
+                if candidate is None or candidate[1] > termination_rate:
+                    candidate = entry
+
+        for entry in popped_entry_list:
+            heapq.heappush(self.heap, entry)
+
+        return candidate[-1] if candidate is not None else None
+
+    def update(self, zone_name, instance_count, termination_rate):
+        zone_order = self.zone_order.setdefault(zone_name, len(self.zone_order))
+        entry = (instance_count, termination_rate, zone_order, zone_name)
+
+        if self.entry_map.get(zone_name) != entry:
+            self.entry_map[zone_name] = entry
+            heapq.heappush(self.heap, entry)
+
+            # Zone uptime changes every tick, rebuild once outdated entries outnumber current ones
+            if len(self.heap) > PLACEMENT_COMPACT_RATIO * len(self.entry_map):
+                self._compact()
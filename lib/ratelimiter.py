@@ -0,0 +1,62 @@
+import heapq
+import itertools
+import threading
+import time
+
+# External modules
+from constant import *
+
+class RateLimiter:
+    def __init__(self, rate, burst):
+        self.burst = float(burst)
+        self.condition = threading.Condition()
+        self.last_refill_time = time.time()
+        self.rate = float(rate)
+        self.sequence = itertools.count()
+        self.throttled_count = dict((priority, 0) for priority in API_PRIORITY_NAME)
+        self.throttled_time = dict((priority, 0.0) for priority in API_PRIORITY_NAME)
+        self.token = float(burst)
+        self.waiter_heap = []
+
+    def _acquire_token(self, priority):
+        # Waiters are served by priority class first then by arrival order
+        waiter = (priority, next(self.sequence))
+        start_time, throttled = time.time(), False
+
+        with self.condition:
+            heapq.heappush(self.waiter_heap, waiter)
+            try:
+                while True:
+                    self._refill()
+                    if self.waiter_heap[0] == waiter and self.token >= 1:
+                        self.token -= 1
+                        break
+
+                    # Only the first waiter sleeps until next token refill, others wait for their turn
+                    throttled = True
+                    refill_time = (1 - self.token) / self.rate
+                    self.condition.wait(refill_time if self.waiter_heap[0] == waiter else None)
+            finally:
+                self.waiter_heap.remove(waiter)
+                heapq.heapify(self.waiter_heap)
+                self.condition.notify_all()
+
+            if throttled:
+                self.throttled_count[priority] += 1
+                self.throttled_time[priority] += time.time() - start_time
+
+    def _refill(self):
+        current_time = time.time()
+        self.token = min(self.burst, self.token + (current_time - self.last_refill_time) * self.rate)
+        self.last_refill_time = current_time
+
+    def acquire(self, priority, token_count=1):
+        for index in range(token_count):
+            self._acquire_token(priority)
+
+    def get_metric_list(self):
+        metric_list = []
+        for priority in sorted(API_PRIORITY_NAME):
+            metric_list.append((METRIC_API_THROTTLED_COUNT % API_PRIORITY_NAME[priority], self.throttled_count[priority]))
+            metric_list.append((METRIC_API_THROTTLED_TIME % API_PRIORITY_NAME[priority], round(self.throttled_time[priority], UPTIME_DECIMAL)))
+        return metric_list
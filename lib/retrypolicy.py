@@ -0,0 +1,81 @@
+import httplib
+import httplib2
+import random
+import threading
+import time
+
+# External modules
+from constant import *
+from googleapiclient.errors import HttpError
+
+class RetryPolicy:
+    def __init__(self, logger, max_retry_count=MAX_API_RETRY_COUNT, deadline=API_RETRY_DEADLINE):
+        self.abort_event = threading.Event()
+        self.deadline = deadline
+        self.failure_count = {}
+        self.lock = threading.Lock()
+        self.log = logger
+        self.max_retry_count = max_retry_count
+        self.retry_count = {}
+        self.retry_delay = {}
+
+    def _record(self, operation_name, delay=None):
+        with self.lock:
+            if delay is None:
+                self.failure_count[operation_name] = self.failure_count.get(operation_name, 0) + 1
+            else:
+                self.retry_count[operation_name] = self.retry_count.get(operation_name, 0) + 1
+                self.retry_delay[operation_name] = self.retry_delay.get(operation_name, 0.0) + delay
+
+    def execute(self, operation_name, target, *args):
+        start_time, attempt = time.time(), 0
+
+        while True:
+            try:
+                return target(*args)
+            except Exception, exception:
+                delay = self.get_retry_delay(operation_name, exception, attempt, start_time)
+                if delay is None:
+                    raise
+                self.abort_event.wait(delay)
+                attempt += 1
+
+    def get_retry_delay(self, operation_name, exception, attempt, start_time):
+        # Full jitter backoff spreads out retries of concurrent callers failing at the same time
+        delay = random.uniform(0, min(API_RETRY_MAX_DELAY, API_RETRY_BASE_DELAY * (2 ** attempt)))
+        deadline_exceeded = (time.time() - start_time + delay) > self.deadline
+
+        # None is returned when the failed call must not be retried
+        if not self.is_retryable(exception):
+            self._record(operation_name)
+            self.log(API_FAILURE_MESSAGE % (operation_name, exception))
+            return None
+        elif attempt >= self.max_retry_count or deadline_exceeded or self.abort_event.is_set():
+            self._record(operation_name)
+            self.log(API_MAX_RETRY_NESSAGE % (operation_name, attempt + 1, exception))
+            return None
+
+        self._record(operation_name, delay)
+        self.log(API_RETRY_MESSAGE % (operation_name, exception))
+        return delay
+
+    def get_metric_list(self):
+        metric_list = []
+        with self.lock:
+            for operation_name in sorted(set(self.retry_count.keys() + self.failure_count.keys())):
+                metric_list.append((METRIC_API_RETRY_COUNT % operation_name, self.retry_count.get(operation_name, 0)))
+                metric_list.append((METRIC_API_RETRY_DELAY % operation_name, round(self.retry_delay.get(operation_name, 0.0), UPTIME_DECIMAL)))
+                metric_list.append((METRIC_API_FAILURE_COUNT % operation_name, self.failure_count.get(operation_name, 0)))
+        return metric_list
+
+    def is_retryable(self, exception):
+        if isinstance(exception, HttpError):
+            status = int(exception.resp.status)
+            rate_limited = status == 403 and 'ratelimitexceeded' in str(exception.content).lower()
+            return status == 429 or status >= 500 or rate_limited
+        else:
+            # Connection level failures are transient, anything else is a bug that retrying will not fix
+            return isinstance(exception, (IOError, httplib.HTTPException, httplib2.HttpLib2Error))
+
+    def shutdown(self):
+        self.abort_event.set()
@@ -17,6 +17,7 @@ class Slackbot:
         self.logger = self.util.logger
         self.sc = SlackClient(self.config.SLACKBOT_API_TOKEN)
         self._msg_queue, self.config_table, self.cost_table, self.instance_table, self.zone_table = [], [], [], [], []
+        self.metric_table = []
 
     def format_slack_table(self, table, note=None, make_single_column=False):
         single_column_table = ''
@@ -77,6 +78,8 @@ class Slackbot:
             message = self.format_slack_table(self.config_table, None, True)
         elif SLACKBOT_CMD_LI in lowercase_text:
             message = self.format_slack_table(self.instance_table)
+        elif SLACKBOT_CMD_METRIC in lowercase_text:
+            message = self.format_slack_table(self.metric_table)
         elif SLACKBOT_CMD_SAVINGS in lowercase_text:
             message = self.format_slack_table(self.cost_table, note=SLACKBOT_MSG_COST_NOTE)
         elif SLACKBOT_CMD_LZ in lowercase_text:
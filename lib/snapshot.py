@@ -0,0 +1,10 @@
+from collections import namedtuple
+from instance import *
+
+# Immutable records published once per tick, reader threads never see a partially updated state
+InstanceRecord = namedtuple('InstanceRecord', Instance.__slots__)
+Snapshot = namedtuple('Snapshot', ['version', 'instance_list', 'zone_list'])
+ZoneRecord = namedtuple('ZoneRecord', ['name', 'instance_count', 'pe_uptime_hour', 'npe_uptime_hour', 'total_termination_count', 'termination_rate'])
+
+def get_instance_record(instance):
+    return InstanceRecord(**instance.__getstate__())
@@ -0,0 +1,150 @@
+import sqlite3
+import sys
+import time
+
+# External modules
+from cloud import *
+from constant import *
+from journal import *
+
+INSTANCE_COLUMN_LIST    = list(Instance.__slots__)
+ZONE_COLUMN_LIST        = ['name', 'instance_count', 'pe_uptime_hour', 'npe_uptime_hour', 'total_termination_count',
+                           'ewma_termination_count', 'ewma_uptime_hour', 'ewma_ts']
+
+SQLITE_SCHEMA           = '''
+CREATE TABLE IF NOT EXISTS instances (name TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS zones (name TEXT PRIMARY KEY, instance_count INTEGER, pe_uptime_hour REAL, npe_uptime_hour REAL,
+    total_termination_count INTEGER, ewma_termination_count REAL, ewma_uptime_hour REAL, ewma_ts REAL);
+CREATE TABLE IF NOT EXISTS zone_window_buckets (zone TEXT, bucket_id INTEGER, termination_count INTEGER, uptime_hour REAL,
+    PRIMARY KEY (zone, bucket_id));
+CREATE TABLE IF NOT EXISTS termination_events (id INTEGER PRIMARY KEY AUTOINCREMENT, zone TEXT, timestamp REAL);
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value);
+'''
+
+class SQLiteState:
+    def __init__(self, name, util):
+        # WAL mode lets external tools read the state while GCE Manager is writing it
+        self.checkpoint_ts = 0
+        self.connection = sqlite3.connect(SQLITE_FILE_PATH_FORMAT % (util.get_current_user_home(), name), check_same_thread=False)
+        self.connection.text_factory = str
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SQLITE_SCHEMA)
+        self.deleted_instance_set = set()
+        self.dirty_instance_map = {}
+        self.name = name
+        self.termination_event_list = []
+        self.util = util
+
+        # Instance table follows Instance attributes, column(s) for newly added attribute are added on startup
+        existing_column_list = [column[1] for column in self.connection.execute('PRAGMA table_info(instances)')]
+        for column in INSTANCE_COLUMN_LIST:
+            if column not in existing_column_list:
+                self.connection.execute('ALTER TABLE instances ADD COLUMN %s' % column)
+        self.connection.commit()
+
+    def _checkpoint(self, cloud):
+        # Uptime of every instance and zone is written together so that instance accounted_ts matches zone uptime
+        for instance in cloud.get_instance_list():
+            self._write_instance(instance.__getstate__())
+
+        for zone in cloud.get_zone_list():
+            window = zone.window
+            self.connection.execute('INSERT OR REPLACE INTO zones (%s) VALUES (%s)' % (','.join(ZONE_COLUMN_LIST), ','.join('?' * len(ZONE_COLUMN_LIST))),
+                (zone.name, zone.instance_count, zone.pe_uptime_hour, zone.npe_uptime_hour, zone.total_termination_count,
+                window.ewma_termination_count, window.ewma_uptime_hour, window.ewma_ts))
+            self.connection.execute('DELETE FROM zone_window_buckets WHERE zone = ?', (zone.name,))
+            self.connection.executemany('INSERT INTO zone_window_buckets VALUES (?, ?, ?, ?)',
+                [(zone.name, bucket_id, window.termination_count_list[bucket_index], window.uptime_hour_list[bucket_index])
+                for bucket_index, bucket_id in enumerate(window.bucket_id_list) if bucket_id is not None])
+
+        # Termination event(s) up to here are included in zone window bucket(s), hence pruned in the same transaction
+        self.connection.execute('INSERT OR REPLACE INTO state VALUES (?, (SELECT IFNULL(MAX(seq), 0) FROM sqlite_sequence WHERE name = ?))',
+            (SQLITE_CHECKPOINT_KEY, 'termination_events'))
+        self.connection.execute('DELETE FROM termination_events WHERE id <= (SELECT value FROM state WHERE key = ?)', (SQLITE_CHECKPOINT_KEY,))
+        self.checkpoint_ts = time.time()
+
+    def _load_zone(self, cloud, zone_row):
+        zone_state = dict(zip(ZONE_COLUMN_LIST, zone_row))
+        zone = Zone(zone_state['name'])
+        zone.instance_count = zone_state['instance_count'] or 0
+        zone.pe_uptime_hour = zone_state['pe_uptime_hour'] or 0
+        zone.npe_uptime_hour = zone_state['npe_uptime_hour'] or 0
+        zone.total_termination_count = zone_state['total_termination_count'] or 0
+        zone.window.ewma_termination_count = zone_state['ewma_termination_count'] or 0.0
+        zone.window.ewma_uptime_hour = zone_state['ewma_uptime_hour'] or 0.0
+        zone.window.ewma_ts = zone_state['ewma_ts']
+
+        bucket_cursor = self.connection.execute('SELECT bucket_id, termination_count, uptime_hour FROM zone_window_buckets WHERE zone = ?', (zone.name,))
+        for bucket_id, termination_count, uptime_hour in bucket_cursor:
+            zone.window.load_bucket(bucket_id, termination_count, uptime_hour)
+        cloud.add_zone(zone)
+
+    def _write_instance(self, instance_state):
+        self.connection.execute('INSERT OR REPLACE INTO instances (%s) VALUES (%s)' % (','.join(INSTANCE_COLUMN_LIST), ','.join('?' * len(INSTANCE_COLUMN_LIST))),
+            [instance_state[column] for column in INSTANCE_COLUMN_LIST])
+
+    def add_termination(self, zone_name, timestamp):
+        self.termination_event_list.append((zone_name, timestamp))
+
+    def close(self):
+        self.connection.close()
+
+    def delete_instance(self, instance_name):
+        self.dirty_instance_map.pop(instance_name, None)
+        self.deleted_instance_set.add(instance_name)
+
+    def flush(self, cloud):
+        try:
+            # Dirty row(s) of a whole tick are written in a single transaction
+            with self.connection:
+                self.connection.executemany('DELETE FROM instances WHERE name = ?', [(name,) for name in self.deleted_instance_set])
+                for instance_state in self.dirty_instance_map.values():
+                    self._write_instance(instance_state)
+
+                self.connection.executemany('INSERT INTO termination_events (zone, timestamp) VALUES (?, ?)', self.termination_event_list)
+                for zone_name in set(zone_name for zone_name, timestamp in self.termination_event_list):
+                    self.connection.execute('INSERT OR IGNORE INTO zones (name) VALUES (?)', (zone_name,))
+                    self.connection.execute('UPDATE zones SET total_termination_count = ? WHERE name = ?',
+                        (cloud.get_zone(zone_name).total_termination_count, zone_name))
+
+                if (time.time() - self.checkpoint_ts) > STATE_CHECKPOINT_SECOND:
+                    self._checkpoint(cloud)
+
+            self.deleted_instance_set.clear()
+            self.dirty_instance_map.clear()
+            del self.termination_event_list[:]
+        except Exception, exception:
+            self.util.logger.info(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
+
+    def load(self):
+        cloud = Cloud()
+
+        # Startup is eager, every zone, window bucket and instance row is loaded into Cloud before monitoring starts
+        for zone_row in self.connection.execute('SELECT %s FROM zones' % ','.join(ZONE_COLUMN_LIST)).fetchall():
+            self._load_zone(cloud, zone_row)
+
+        instance_cursor = self.connection.execute('SELECT * FROM instances')
+        column_list = [column[0] for column in instance_cursor.description]
+        for instance_row in instance_cursor:
+            instance = Instance()
+            instance.__setstate__(dict(zip(column_list, instance_row)))
+            instance.preemptible = bool(instance.preemptible) if instance.preemptible is not None else None
+            cloud.add_instance(instance)
+
+        # Migrate from journaled cloud cache when database is still empty, first flush writes a full checkpoint
+        if len(cloud.get_zone_list()) == 0 and cloud.get_instance_count() == 0:
+            return Journal(self.name, self.util).read()
+
+        # Termination event(s) recorded after the last checkpoint are not in zone window bucket(s) yet
+        checkpoint_row = self.connection.execute('SELECT value FROM state WHERE key = ?', (SQLITE_CHECKPOINT_KEY,)).fetchone()
+        event_cursor = self.connection.execute('SELECT zone, timestamp FROM termination_events WHERE id > ?', (checkpoint_row[0] if checkpoint_row else 0,))
+        for zone_name, timestamp in event_cursor:
+            if cloud.has_zone(zone_name):
+                cloud.get_zone(zone_name).window.add_termination(timestamp)
+
+        return cloud
+
+    def update_instance(self, instance):
+        self.deleted_instance_set.discard(instance.name)
+        self.dirty_instance_map[instance.name] = instance.__getstate__()
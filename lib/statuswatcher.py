@@ -0,0 +1,65 @@
+import threading
+import time
+
+# External modules
+from constant import *
+from workerpool import *
+
+class StatusWatcher:
+    def __init__(self, cloud):
+        # Waiter(s) are resolved by the poll that observes the awaited status, nobody re-reads the live cloud in a loop
+        self.cloud = cloud
+        self.lock = threading.Lock()
+        self.waiter_map = {}
+
+    def _remove_waiter(self, instance_name, waiter):
+        waiter_list = self.waiter_map.get(instance_name, [])
+        if waiter in waiter_list:
+            waiter_list.remove(waiter)
+        if len(waiter_list) == 0:
+            self.waiter_map.pop(instance_name, None)
+
+    def _watch(self, instance_name, is_awaited, deadline):
+        future = Future()
+        status = self.cloud.get_instance(instance_name).status
+        if is_awaited(status):
+            future.set_result(status)
+            return future, None
+
+        waiter = (is_awaited, future, deadline)
+        self.waiter_map.setdefault(instance_name, []).append(waiter)
+        return future, waiter
+
+    def get_metric_list(self):
+        with self.lock:
+            return [(METRIC_STATUS_WAITER, sum(len(waiter_list) for waiter_list in self.waiter_map.values()))]
+
+    def update(self, cloud):
+        current_time = time.time()
+
+        with self.lock:
+            self.cloud = cloud
+            for instance_name, waiter_list in self.waiter_map.items():
+                # Deleted instance has None status, waiter past its deadline is resolved with the current status
+                status = cloud.get_instance(instance_name).status
+                for waiter in [waiter for waiter in waiter_list if waiter[0](status) or waiter[2] < current_time]:
+                    self._remove_waiter(instance_name, waiter)
+                    waiter[1].set_result(status)
+
+    def wait_for_status(self, instance_name, status, timeout=None):
+        with self.lock:
+            future, waiter = self._watch(instance_name, lambda current_status: current_status == status, float('inf'))
+
+        try:
+            future.result(timeout)
+            return True
+        except FutureTimeoutError:
+            # Status may be observed right after the timeout, before the waiter is removed
+            with self.lock:
+                self._remove_waiter(instance_name, waiter)
+                return future.done()
+
+    def watch(self, instance_name, is_awaited, timeout):
+        # Non-blocking, returned future is resolved with the first status satisfying is_awaited or once timeout passed
+        with self.lock:
+            return self._watch(instance_name, is_awaited, time.time() + timeout)[0]
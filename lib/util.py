@@ -52,14 +52,18 @@ class Util:
 
     def save_object(self, name, _object):
         try:
-            # Save to a temporary path then move when pickle done to achieve atomic write
-            tmp_file = '/tmp/.%s%s' % (name, PICKLE_FILE_EXTENSION)
+            # Save to a temporary file in the same directory then rename when pickle is on disk to achieve atomic write
             abs_fname = PICKLE_FILE_PATH_FORMAT % (self.get_current_user_home(), name, PICKLE_FILE_EXTENSION)
+            tmp_file = '%s.tmp' % abs_fname
             with open(tmp_file, 'wb') as output:
                 pickle.dump(_object, output, pickle.HIGHEST_PROTOCOL)
+                output.flush()
+                os.fsync(output.fileno())
             os.rename(tmp_file, abs_fname)
+            return True
         except Exception, exception:
             self.logger.info(API_FAILURE_MESSAGE % (sys._getframe().f_code.co_name, exception))
+            return False
 
     def send_email(self, html, recipient_list, subject=None, retry_count=MAX_API_RETRY_COUNT):
         try:
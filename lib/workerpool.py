@@ -0,0 +1,102 @@
+import Queue
+import threading
+
+class FutureTimeoutError(Exception):
+    pass
+
+class WorkerPoolShutdownError(Exception):
+    pass
+
+class Future:
+    def __init__(self):
+        self.callback_list = []
+        self.event = threading.Event()
+        self.exception = None
+        self.lock = threading.Lock()
+        self.value = None
+
+    def _set_done(self):
+        with self.lock:
+            callback_list, self.callback_list = self.callback_list, []
+            self.event.set()
+
+        for callback in callback_list:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        with self.lock:
+            if not self.event.is_set():
+                self.callback_list.append(callback)
+                return
+        callback(self)
+
+    def done(self):
+        return self.event.is_set()
+
+    def result(self, timeout=None):
+        if not self.event.wait(timeout):
+            raise FutureTimeoutError('Result is not available after %s second(s)' % timeout)
+        elif self.exception is not None:
+            raise self.exception
+        else:
+            return self.value
+
+    def set_exception(self, exception):
+        self.exception = exception
+        self._set_done()
+
+    def set_result(self, value):
+        self.value = value
+        self._set_done()
+
+class WorkerPool:
+    def __init__(self, worker_count):
+        self.abort_all = False
+        self.lock = threading.Lock()
+        self.task_queue = Queue.Queue()
+        self.worker_list = []
+
+        for index in range(worker_count):
+            worker = threading.Thread(target=self._worker)
+            worker.daemon = True
+            worker.start()
+            self.worker_list.append(worker)
+
+    def _worker(self):
+        while True:
+            task = self.task_queue.get()
+
+            # Sentinel task is queued by shutdown() to release idle worker
+            if task is None:
+                break
+
+            future, target, args = task
+            try:
+                future.set_result(target(*args))
+            except Exception, exception:
+                future.set_exception(exception)
+
+    def shutdown(self):
+        with self.lock:
+            self.abort_all = True
+
+            # Task(s) not started yet are failed so that nobody blocks on their future forever
+            while True:
+                try:
+                    task = self.task_queue.get_nowait()
+                except Queue.Empty:
+                    break
+                if task is not None:
+                    task[0].set_exception(WorkerPoolShutdownError('Worker pool is shut down'))
+
+            for worker in self.worker_list:
+                self.task_queue.put(None)
+
+    def submit(self, target, *args):
+        future = Future()
+        with self.lock:
+            if self.abort_all:
+                future.set_exception(WorkerPoolShutdownError('Worker pool is shut down'))
+            else:
+                self.task_queue.put((future, target, args))
+        return future
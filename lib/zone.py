@@ -1,19 +1,44 @@
+import time
 from pprint import *
 from constant import *
+from instance import intern_string
+from zonewindow import *
+
+class Zone(object):
+    __slots__ = ('name', 'instance_count', 'pe_uptime_hour', 'npe_uptime_hour', 'total_termination_count', 'window')
 
-class Zone:
     def __init__(self, name=None):
-        self.name = name
+        self.name = intern_string(name)
         self.instance_count = 0
         self.pe_uptime_hour = 0
         self.npe_uptime_hour = 0
         self.total_termination_count = 0
+        self.window = ZoneWindow()
+
+    def __getstate__(self):
+        return dict((attribute, getattr(self, attribute)) for attribute in self.__slots__)
+
+    def __setstate__(self, state):
+        # State pickled from dict-backed Zone is accepted as well, missing attribute keeps its default value
+        self.__init__(state.get('name'))
+        for attribute in self.__slots__:
+            if attribute in state:
+                setattr(self, attribute, state[attribute])
+
+        self.name = intern_string(self.name)
 
     def get_total_uptime_hour(self):
         return self.pe_uptime_hour + self.npe_uptime_hour
 
-    def get_termination_rate(self):
-        return (float(self.total_termination_count) / self.get_total_uptime_hour()) if self.get_total_uptime_hour() > 0 else 0.0
+    def get_termination_rate(self, window=RATE_WINDOW_LIFETIME):
+        termination_count, uptime_hour = self.get_termination_stat(window)
+        return (float(termination_count) / uptime_hour) if uptime_hour > 0 else 0.0
+
+    def get_termination_stat(self, window=RATE_WINDOW_LIFETIME):
+        if window == RATE_WINDOW_LIFETIME:
+            return self.total_termination_count, self.get_total_uptime_hour()
+        else:
+            return self.window.get_termination_stat(window, time.time())
 
     def __repr__(self):
-        return pformat(vars(self), indent=PRETTY_PRINT_INDENT, width=PRETTY_PRINT_WIDTH)
+        return pformat(self.__getstate__(), indent=PRETTY_PRINT_INDENT, width=PRETTY_PRINT_WIDTH)
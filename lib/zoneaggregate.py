@@ -0,0 +1,43 @@
+# External modules
+from basezoneaggregate import *
+from constant import *
+from placementindex import *
+
+class ZoneAggregate(BaseZoneAggregate):
+    def __init__(self, zone_list, configured_zone_list, termination_rate_threshold, termination_rate_window=RATE_WINDOW_LIFETIME):
+        # Aggregates are refreshed in place on every zone update, lookups never walk the zone list
+        self.placement_index = PlacementIndex()
+        self.termination_rate_map = {}
+        self.unstable_zone_count = 0
+        self.unstable_zone_set = set()
+        BaseZoneAggregate.__init__(self, zone_list, configured_zone_list, termination_rate_threshold, termination_rate_window)
+
+    def _pick_zone_candidate(self, min_zone_spread_count, include_unstable_zone):
+        is_excluded = (lambda zone_name: False) if include_unstable_zone else self.is_unstable
+        return self.placement_index.pick(min_zone_spread_count, is_excluded)
+
+    def _refresh(self, zone):
+        termination_rate = zone.get_termination_rate(self.termination_rate_window)
+        unstable = termination_rate > self.termination_rate_threshold
+        self.termination_rate_map[zone.name] = termination_rate
+        self.placement_index.update(zone.name, zone.instance_count, termination_rate)
+
+        # Only configured zone(s) count towards overall preemptible supply
+        if unstable and zone.name not in self.unstable_zone_set:
+            self.unstable_zone_set.add(zone.name)
+            self.unstable_zone_count += 1 if zone.name in self.configured_zone_set else 0
+        elif not unstable and zone.name in self.unstable_zone_set:
+            self.unstable_zone_set.discard(zone.name)
+            self.unstable_zone_count -= 1 if zone.name in self.configured_zone_set else 0
+
+    def get_stable_zone_count(self):
+        return len(self.zone_map) - len(self.unstable_zone_set)
+
+    def get_termination_rate(self, zone_name):
+        return self.termination_rate_map.get(zone_name, 0.0)
+
+    def get_unstable_zone_count(self):
+        return self.unstable_zone_count
+
+    def is_unstable(self, zone_name):
+        return zone_name in self.unstable_zone_set
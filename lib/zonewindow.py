@@ -0,0 +1,80 @@
+# External modules
+from constant import *
+
+class ZoneWindow:
+    def __init__(self):
+        # Ring buffer of fixed width bucket(s) covering the longest window, memory is bounded regardless of history length
+        self.bucket_id_list = [None] * WINDOW_BUCKET_COUNT
+        self.termination_count_list = [0] * WINDOW_BUCKET_COUNT
+        self.uptime_hour_list = [0.0] * WINDOW_BUCKET_COUNT
+
+        self.ewma_termination_count = 0.0
+        self.ewma_ts = None
+        self.ewma_uptime_hour = 0.0
+
+    def _get_bucket_index(self, bucket_id):
+        bucket_index = bucket_id % WINDOW_BUCKET_COUNT
+
+        # Recycle bucket left over from an earlier round of the ring buffer
+        if self.bucket_id_list[bucket_index] != bucket_id:
+            self.bucket_id_list[bucket_index] = bucket_id
+            self.termination_count_list[bucket_index] = 0
+            self.uptime_hour_list[bucket_index] = 0.0
+        return bucket_index
+
+    def _get_ewma(self, timestamp):
+        if self.ewma_ts is None or timestamp <= self.ewma_ts:
+            return self.ewma_termination_count, self.ewma_uptime_hour
+
+        decay = 0.5 ** ((timestamp - self.ewma_ts) / float(EWMA_HALF_LIFE_SECOND))
+        return self.ewma_termination_count * decay, self.ewma_uptime_hour * decay
+
+    def _update_ewma(self, timestamp, termination_count, uptime_hour):
+        ewma_termination_count, ewma_uptime_hour = self._get_ewma(timestamp)
+        self.ewma_termination_count = ewma_termination_count + termination_count
+        self.ewma_uptime_hour = ewma_uptime_hour + uptime_hour
+        if self.ewma_ts is None or timestamp > self.ewma_ts:
+            self.ewma_ts = timestamp
+
+    def add_termination(self, timestamp):
+        bucket_index = self._get_bucket_index(int(timestamp // WINDOW_BUCKET_SECOND))
+        self.termination_count_list[bucket_index] += 1
+        self._update_ewma(timestamp, 1, 0)
+
+    def add_uptime(self, start_ts, end_ts):
+        if end_ts <= start_ts:
+            return
+
+        self._update_ewma(end_ts, 0, (end_ts - start_ts) * HOUR_PER_SECOND)
+        bucket_id = int(start_ts // WINDOW_BUCKET_SECOND)
+        if bucket_id == int(end_ts // WINDOW_BUCKET_SECOND):
+            self.uptime_hour_list[self._get_bucket_index(bucket_id)] += (end_ts - start_ts) * HOUR_PER_SECOND
+            return
+
+        # Spread uptime over the bucket(s) it spans, uptime older than the ring buffer is not kept
+        start_ts = max(start_ts, end_ts - WINDOW_BUCKET_SECOND * WINDOW_BUCKET_COUNT)
+        while start_ts < end_ts:
+            bucket_id = int(start_ts // WINDOW_BUCKET_SECOND)
+            bucket_end_ts = min((bucket_id + 1) * WINDOW_BUCKET_SECOND, end_ts)
+            self.uptime_hour_list[self._get_bucket_index(bucket_id)] += (bucket_end_ts - start_ts) * HOUR_PER_SECOND
+            start_ts = bucket_end_ts
+
+    def load_bucket(self, bucket_id, termination_count, uptime_hour):
+        bucket_index = self._get_bucket_index(bucket_id)
+        self.termination_count_list[bucket_index] = termination_count
+        self.uptime_hour_list[bucket_index] = uptime_hour
+
+    def get_termination_stat(self, window, timestamp):
+        if window == RATE_WINDOW_EWMA:
+            return self._get_ewma(timestamp)
+
+        termination_count, uptime_hour = 0, 0.0
+        last_bucket_id = int(timestamp // WINDOW_BUCKET_SECOND)
+        first_bucket_id = last_bucket_id - (RATE_WINDOW_SECOND[window] // WINDOW_BUCKET_SECOND) + 1
+
+        for bucket_index, bucket_id in enumerate(self.bucket_id_list):
+            if bucket_id is not None and first_bucket_id <= bucket_id <= last_bucket_id:
+                termination_count += self.termination_count_list[bucket_index]
+                uptime_hour += self.uptime_hour_list[bucket_index]
+
+        return termination_count, uptime_hour